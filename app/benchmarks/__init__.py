@@ -0,0 +1 @@
+# Benchmark suite, run with python -m benchmarks.run from the app directory
@@ -0,0 +1,78 @@
+# Compare two benchmark result files
+#
+#   python -m benchmarks.compare before.json after.json [--threshold 0.10]
+import sys
+import json
+import argparse
+
+
+def load_results(path):
+    with open(path, "r", encoding="utf-8") as file:
+        report = json.load(file)
+
+    return report.get("meta", {}), {result["name"]: result for result in report["results"]}
+
+
+def compare(before_path, after_path, threshold=0.10):
+    """
+    Print the time-per-item ratio of every benchmark present in both files.
+
+    Args:
+        before_path (str): Baseline results
+        after_path (str): Results to compare
+        threshold (float): Slowdown above which a benchmark counts as a regression
+
+    Returns:
+        list[str]: Names of the regressed benchmarks
+    """
+    before_meta, before = load_results(before_path)
+    after_meta, after = load_results(after_path)
+
+    print(f"before: {before_meta.get('commit')}  after: {after_meta.get('commit')}")
+    print(f"{'benchmark':<36} {'before ms':>11} {'after ms':>11} {'ratio':>7} {'peak MB':>15}")
+
+    regressions = []
+    for name in before:
+        if name not in after:
+            continue
+
+        old, new = before[name], after[name]
+        # Time per item, so runs over different corpus sizes stay comparable
+        old_time = old["wall_s"] / max(old.get("items", 1), 1)
+        new_time = new["wall_s"] / max(new.get("items", 1), 1)
+        ratio = new_time / old_time if old_time else float("inf")
+
+        peak = ""
+        if old.get("peak_traced_bytes") is not None and new.get("peak_traced_bytes") is not None:
+            peak = f"{old['peak_traced_bytes'] / 1e6:.1f} -> {new['peak_traced_bytes'] / 1e6:.1f}"
+
+        flag = ""
+        if ratio > 1 + threshold:
+            flag = "  slower"
+            regressions.append(name)
+        elif ratio < 1 - threshold:
+            flag = "  faster"
+
+        print(f"{name:<36} {old['wall_s'] * 1000:>11.2f} {new['wall_s'] * 1000:>11.2f} {ratio:>7.2f} {peak:>15}{flag}")
+
+    for name in sorted(set(after) - set(before)):
+        print(f"{name:<36} {'-':>11} {after[name]['wall_s'] * 1000:>11.2f}")
+
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare two benchmark result files.")
+    parser.add_argument("before")
+    parser.add_argument("after")
+    parser.add_argument("--threshold", type=float, default=0.10, help="Relative slowdown reported as a regression")
+    args = parser.parse_args(argv)
+
+    regressions = compare(args.before, args.after, args.threshold)
+
+    # Non-zero exit status when something got slower, for use in scripts
+    sys.exit(1 if regressions else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,298 @@
+# Benchmarks of ingest, index updates, nearest-station queries and dataset loads
+#
+# Run from the app directory:
+#   python -m benchmarks.run --stations 200 --output results.json
+#   python -m benchmarks.compare before.json after.json
+import os
+import gc
+import sys
+import json
+import time
+import shutil
+import argparse
+import platform
+import tempfile
+import subprocess
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+from volansarch import EPWFilePreparator, EPWFileselection, StationCatalog, StationCache, get_settings
+from volansarch.station_store import PARSED_FORMATS
+from volansarch.spatial_index import kdtree_available
+
+from .synthetic_epw import write_corpus, station_coordinates
+
+try:
+    import resource
+except ImportError:  # Not available on Windows
+    resource = None
+
+RESULTS_VERSION = 1
+
+
+def measure(name, run, setup=None, repeat=1, items=1, unit="item", memory=True, **params):
+    """
+    Time a benchmark and optionally trace its peak Python/NumPy allocations.
+
+    Timed runs and the traced run are separate, so tracing does not skew the wall time.
+
+    Args:
+        name (str): Benchmark name
+        run (callable): Code under test
+        setup (callable, optional): Called before every run, not timed
+        repeat (int): Timed runs, the fastest one is reported
+        items (int): Items processed by one run, for the throughput
+        unit (str): Name of an item
+        memory (bool): Trace the peak allocations in an extra run
+        **params: Parameters stored with the result
+
+    Returns:
+        dict: Result record
+    """
+    timings = []
+    for _ in range(repeat):
+        if setup is not None:
+            setup()
+        gc.collect()
+        start = time.perf_counter()
+        run()
+        timings.append(time.perf_counter() - start)
+
+    peak_bytes = None
+    if memory:
+        if setup is not None:
+            setup()
+        gc.collect()
+        tracemalloc.start()
+        try:
+            run()
+            _, peak_bytes = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+
+    wall = min(timings)
+    result = {
+        "name": name,
+        "wall_s": wall,
+        "wall_s_runs": timings,
+        "items": items,
+        "unit": unit,
+        "throughput_per_s": items / wall if wall > 0 else None,
+        "peak_traced_bytes": peak_bytes,
+        "params": params,
+    }
+    print(f"{name:<36} {wall * 1000:>10.2f} ms  {result['throughput_per_s'] or 0:>12.1f} {unit}/s"
+          + (f"  peak {peak_bytes / 1e6:.1f} MB" if peak_bytes is not None else ""))
+
+    return result
+
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"], cwd=os.path.dirname(os.path.abspath(__file__)),
+            capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def use_workspace(workdir):
+    # Point the preparator and the selections at the benchmark workspace
+    settings = {
+        "EPW_RAW_PATH": os.path.join(workdir, "raw"),
+        "EPW_PARSED_PATH": os.path.join(workdir, "parsed"),
+        "EPW_COMBINED_PATH": os.path.join(workdir, "combined"),
+        "EPW_COMBINED_INDEX_NAME": "index.csv",
+    }
+    get_settings().update(settings)
+
+    return settings
+
+
+def reset(*paths):
+    for path in paths:
+        shutil.rmtree(path, ignore_errors=True)
+        os.makedirs(path, exist_ok=True)
+
+
+def run_benchmarks(args):
+    workdir = args.workdir or tempfile.mkdtemp(prefix="volansarch-bench-")
+    settings = use_workspace(workdir)
+    parsed_path, combined_path = settings["EPW_PARSED_PATH"], settings["EPW_COMBINED_PATH"]
+    memory = not args.no_memory
+    results = []
+
+    # Corpus
+    reset(settings["EPW_RAW_PATH"])
+    start = time.perf_counter()
+    files = write_corpus(
+        settings["EPW_RAW_PATH"], args.stations, rows_per_hour=args.rows_per_hour,
+        na_rate=args.na_rate, zip_share=args.zip_share, seed=args.seed,
+    )
+    print(f"Corpus: {len(files)} stations in {time.perf_counter() - start:.1f} s ({workdir})")
+    rows = 8760 * args.rows_per_hour * len(files)
+
+    # Query points, reproducible
+    rng = np.random.default_rng(args.seed + 1)
+    lats, lons, _ = station_coordinates(args.queries, args.seed + 1)
+    load_sites = rng.choice(args.queries, size=min(args.load_sites, args.queries), replace=False)
+
+    for output_format in args.formats:
+        preparator = None
+
+        def setup_ingest():
+            nonlocal preparator
+            reset(parsed_path, combined_path)
+            preparator = EPWFilePreparator()
+
+        def ingest():
+            outcome = preparator.parse_many(files, workers=args.workers, output_format=output_format, progress=False)
+            if outcome["failed"]:
+                raise RuntimeError(f"Ingest failed: {outcome['failed']}")
+
+        results.append(measure(
+            f"ingest[{output_format}]", ingest, setup_ingest, items=len(files), unit="station",
+            memory=memory and args.workers == 1, rows=rows, workers=args.workers, format=output_format,
+        ))
+
+        catalog = StationCatalog(dict(settings))
+        catalog.refresh()
+        k = args.loc_numbers
+
+        def load(accessor, cache_factory):
+            def run():
+                cache = cache_factory()
+                for site in load_sites:
+                    accessor(EPWFileselection(lats[site], lons[site], loc_numbers=k, catalog=catalog, cache=cache))
+            return run
+
+        # Cold loads read every station, warm loads hit a cache large enough for all of them
+        cold = lambda: StationCache(0)
+        warm_cache = StationCache(max_bytes=1 << 40)
+        load(lambda selection: selection.data, lambda: warm_cache)()
+
+        loads = {
+            "load_data_cold": (lambda selection: selection.data, cold),
+            "load_data_warm": (lambda selection: selection.data, lambda: warm_cache),
+            "load_metadata_cold": (lambda selection: selection.metadata, cold),
+            "load_select_july_cold": (lambda selection: selection.select(["Dry_Bulb_Temperature"], (7,), (7,)), cold),
+            "load_station_data_cold": (lambda selection: selection.station_data, cold),
+        }
+        for name, (accessor, cache_factory) in loads.items():
+            results.append(measure(
+                f"{name}[{output_format}]", load(accessor, cache_factory), repeat=args.repeat,
+                items=len(load_sites) * k, unit="station", memory=memory, format=output_format, loc_numbers=k,
+            ))
+
+    # Index updates
+    preparator = EPWFilePreparator()
+    entries = [preparator.read_index_entry(file) for file in files]
+
+    def setup_index():
+        reset(combined_path)
+
+    results.append(measure(
+        "index_build_headers", lambda: preparator.build_index(files, workers=args.workers, progress=False),
+        setup_index, items=len(files), unit="station", memory=memory and args.workers == 1, workers=args.workers,
+    ))
+
+    def journal_updates():
+        for entry in entries:
+            preparator.update_combined_index([entry], compact=False)
+
+    results.append(measure("index_journal_append", journal_updates, setup_index, items=len(entries), unit="entry", memory=memory))
+
+    def setup_compact():
+        setup_index()
+        journal_updates()
+
+    results.append(measure("index_compact", preparator.compact_combined_index, setup_compact, items=len(entries), unit="entry", memory=memory))
+
+    # Nearest-station queries
+    catalog = StationCatalog(dict(settings))
+    k = args.loc_numbers
+
+    def single_queries():
+        for lat, lon in zip(lats, lons):
+            catalog.nearest(lat, lon, k)
+
+    results.append(measure("catalog_refresh_cold", lambda: catalog.refresh(force=True), memory=memory, stations=len(files)))
+    results.append(measure(
+        "nearest_catalog", single_queries, repeat=args.repeat, items=len(lats), unit="query",
+        memory=memory, loc_numbers=k, kdtree=kdtree_available(),
+    ))
+    results.append(measure(
+        "nearest_batch", lambda: catalog.nearest_many(lats, lons, k), repeat=args.repeat, items=len(lats),
+        unit="query", memory=memory, loc_numbers=k, kdtree=kdtree_available(),
+    ))
+
+    def cold_queries():
+        # Index read and spatial index load on every query, no shared catalog
+        for lat, lon in zip(lats[:args.cold_queries], lons[:args.cold_queries]):
+            EPWFileselection(lat, lon, loc_numbers=k, cache=StationCache(0))
+
+    results.append(measure(
+        "nearest_cold_selection", cold_queries, repeat=args.repeat, items=min(args.cold_queries, len(lats)),
+        unit="query", memory=memory, loc_numbers=k,
+    ))
+
+    if not args.workdir and not args.keep:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    return {
+        "version": RESULTS_VERSION,
+        "meta": {
+            "commit": git_commit(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "python": sys.version.split()[0],
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "numpy": np.__version__,
+            "pandas": pd.__version__,
+            "scipy": kdtree_available(),
+            "max_rss_kb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss if resource else None,
+            "args": {name: value for name, value in vars(args).items() if name not in ("output", "workdir")},
+        },
+        "results": results,
+    }
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark volansarch on a synthetic EPW corpus.")
+    parser.add_argument("--stations", type=int, default=50, help="Number of synthetic stations")
+    parser.add_argument("--rows-per-hour", type=int, default=1, help="Above 1 for sub-hourly files")
+    parser.add_argument("--na-rate", type=float, default=0.01, help="Share of N_A values on every other station")
+    parser.add_argument("--zip-share", type=float, default=0.5, help="Share of stations written as .zip")
+    parser.add_argument("--formats", nargs="+", default=["json", "columnar"], choices=list(PARSED_FORMATS))
+    parser.add_argument("--workers", type=int, default=1, help="Ingest processes (peak memory is only traced with 1)")
+    parser.add_argument("--queries", type=int, default=2000, help="Random query points")
+    parser.add_argument("--cold-queries", type=int, default=10, help="Queries without a shared catalog")
+    parser.add_argument("--load-sites", type=int, default=10, help="Sites whose stations are loaded")
+    parser.add_argument("--loc-numbers", type=int, default=3, help="Stations per query")
+    parser.add_argument("--repeat", type=int, default=3, help="Timed runs of the query and load benchmarks")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--no-memory", action="store_true", help="Skip the traced runs")
+    parser.add_argument("--workdir", help="Workspace directory, a temporary one when omitted")
+    parser.add_argument("--keep", action="store_true", help="Keep the temporary workspace")
+    parser.add_argument("--output", help="Write the results JSON here instead of stdout")
+
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    report = run_benchmarks(args)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file:
+            json.dump(report, file, indent=4)
+        print(f"Results written to {args.output}")
+    else:
+        print(json.dumps(report, indent=4))
+
+
+if __name__ == "__main__":
+    main()
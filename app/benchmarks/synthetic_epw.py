@@ -0,0 +1,170 @@
+# Synthetic EPW corpus for the benchmarks
+import os
+import zipfile
+
+import numpy as np
+import pandas as pd
+
+# Header lines of a TMYx file, location fields filled per station
+HEADER = [
+    "LOCATION,{city},ST,{country},SRC-TMYx,{station_id},{latitude:.3f},{longitude:.3f},{timezone:.1f},{elevation:.1f}",
+    "DESIGN CONDITIONS,1,Climate Design Data 2009 ASHRAE Handbook,,Heating,1,-20,-18.2,-16.6,-22.9,0.7,-16.6,-20.2,0.9,-13.8,12.5,-4.8,11.2,-4.5,4.6,270,"
+    "Cooling,7,9.9,33.1,23.1,31.3,22.3,29.7,21.5,25,30.5,24.2,29.1,23.4,28.1,5.4,230,23.2,17.9,27.5,22.5,17.2,26.8,21.7,16.4,26.1,79.2,30.6,76,29.2,73.1,28,1024,"
+    "Extremes,10.6,9.4,8.5,29,-24.9,35.6,3.7,1.5,-27.6,36.7,-29.8,37.6,-31.8,38.5,-34.5,39.7",
+    "TYPICAL/EXTREME PERIODS,6,Summer - Week Nearest Max Temperature For Period,Extreme,7/ 6,7/12,Summer - Week Nearest Average Temperature For Period,Typical,8/ 3,8/ 9,"
+    "Winter - Week Nearest Min Temperature For Period,Extreme,1/13,1/19,Winter - Week Nearest Average Temperature For Period,Typical,12/22,1/ 5,"
+    "Autumn - Week Nearest Average Temperature For Period,Typical,10/20,10/26,Spring - Week Nearest Average Temperature For Period,Typical,4/12,4/18",
+    "GROUND TEMPERATURES,3,.5,,,,-1.89,-3.06,-0.99,2.23,10.68,17.20,21.60,22.94,20.66,15.60,8.83,2.56,2,,,,2.44,0.36,0.35,1.62,7.05,12.15,16.41,18.76,18.45,15.73,11.18,6.17,"
+    "4,,,,6.75,4.49,3.71,3.84,6.27,9.28,12.29,14.36,14.90,13.89,11.33,8.58",
+    "HOLIDAYS/DAYLIGHT SAVINGS,No,0,0,0",
+    "COMMENTS 1,Synthetic benchmark station",
+    "COMMENTS 2, -- Ground temps produced with a standard soil diffusivity of 2.3225760E-03 {{m**2/day}}",
+    "DATA PERIODS,1,{rows_per_hour},Data,Sunday, 1/ 1,12/31",
+]
+
+UNCERTAINTY_FLAGS = "?9?9?9?9E0?9?9?9?9?9?9?9?9?9?9?9?9?9?9?9*9*9?9?9?9"
+
+# Measurement columns: (low, high, decimals) of the uniform draws, or a constant
+MEASUREMENTS = [
+    ("Dry_Bulb_Temperature", (-20, 35, 1)),
+    ("Dew_Point_Temperature", (-25, 25, 1)),
+    ("Relative_Humidity", (10, 100, 0)),
+    ("Atmospheric_Station_Pressure", (95000, 102000, 0)),
+    ("Extraterrestrial_Horizontal_Radiation", (0, 1400, 0)),
+    ("Extraterrestrial_Direct_Normal_Radiation", (0, 1400, 0)),
+    ("Horizontal_Infrared_Radiation_Intensity", (200, 400, 0)),
+    ("Global_Horizontal_Radiation", (0, 900, 0)),
+    ("Direct_Normal_Radiation", (0, 900, 0)),
+    ("Diffuse_Horizontal_Radiation", (0, 400, 0)),
+    ("Global_Horizontal_Illuminance", (0, 99999, 0)),
+    ("Direct_Normal_Illuminance", (0, 99999, 0)),
+    ("Diffuse_Horizontal_Illuminance", (0, 99999, 0)),
+    ("Zenith_Luminance", (0, 9999, 0)),
+    ("Wind_Direction", (0, 360, 0)),
+    ("Wind_Speed", (0, 12, 1)),
+    ("Total_Sky_Cover", (0, 10, 0)),
+    ("Opaque_Sky_Cover", (0, 10, 0)),
+    ("Visibility", (0, 80, 1)),
+    ("Ceiling_Height", (0, 77777, 0)),
+    ("Present_Weather_Observation", 9),
+    ("Present_Weather_Codes", 999999999),
+    ("Precipitable_Water", (0, 40, 0)),
+    ("Aerosol_Optical_Depth", 0.123),
+    ("Snow_Depth", 0),
+    ("Days_Since_Last_Snowfall", 88),
+    ("Albedo", 0.16),
+    ("Liquid_Precipitation_Depth", (0, 5, 1)),
+    ("Liquid_Precipitation_Quantity", 1.0),
+]
+
+
+def station_coordinates(stations, seed=0):
+    # Stations spread uniformly over the sphere (latitude from the arcsine of a uniform draw)
+    rng = np.random.default_rng(seed)
+    latitudes = np.degrees(np.arcsin(rng.uniform(-1, 1, stations)))
+    longitudes = rng.uniform(-180, 180, stations)
+    elevations = rng.uniform(0, 2500, stations)
+
+    return latitudes, longitudes, elevations
+
+
+def make_epw(city, latitude, longitude, elevation, rows_per_hour=1, na_rate=0.0, year=2001, seed=0):
+    """
+    Text of a synthetic EPW file.
+
+    Args:
+        city (str): City name of the LOCATION line
+        latitude (float): Latitude of the station
+        longitude (float): Longitude of the station
+        elevation (float): Elevation of the station (m)
+        rows_per_hour (int): Rows per hour, above 1 for sub-hourly data
+        na_rate (float): Share of measurements written as N_A
+        year (int): Year of the rows, the data covers Jan 1 to Dec 31 of a non-leap year
+        seed (int): Seed of the random measurements
+
+    Returns:
+        str: EPW content with CRLF line endings
+    """
+    rng = np.random.default_rng(seed)
+
+    # Time stamps of a 365-day year (2001 calendar), hours 1-24 and evenly spaced minutes
+    days = pd.date_range("2001-01-01", periods=365, freq="D")
+    hours = np.tile(np.repeat(np.arange(1, 25), rows_per_hour), len(days))
+    # Sub-hourly rows start at minutes 0, 60/n, ... (the parser builds a datetime from the minute)
+    minutes = np.tile(np.arange(rows_per_hour) * (60 // rows_per_hour), 24 * len(days))
+    months = np.repeat(days.month.to_numpy(), 24 * rows_per_hour)
+    day_numbers = np.repeat(days.day.to_numpy(), 24 * rows_per_hour)
+    rows = len(hours)
+
+    columns = {
+        "Year": np.full(rows, year),
+        "Month": months,
+        "Day": day_numbers,
+        "Hour": hours,
+        "Minute": minutes,
+        "Data_Source_Uncertainty_Flags": np.full(rows, UNCERTAINTY_FLAGS),
+    }
+
+    for name, spec in MEASUREMENTS:
+        if isinstance(spec, tuple):
+            low, high, decimals = spec
+            values = rng.uniform(low, high, rows).round(decimals)
+            text = values.astype("int64").astype(str) if decimals == 0 else np.char.mod(f"%.{decimals}f", values)
+        else:
+            text = np.full(rows, str(spec))
+
+        if na_rate:
+            text = np.where(rng.random(rows) < na_rate, "N_A", text)
+        columns[name] = text
+
+    header = [
+        line.format(
+            city=city, country="USA", station_id=str(700000 + seed), latitude=latitude, longitude=longitude,
+            timezone=round(longitude / 15), elevation=elevation, rows_per_hour=rows_per_hour,
+        )
+        for line in HEADER
+    ]
+    body = pd.DataFrame(columns).to_csv(header=False, index=False, lineterminator="\r\n")
+
+    return "\r\n".join(header) + "\r\n" + body
+
+
+def write_corpus(raw_path, stations, rows_per_hour=1, na_rate=0.01, zip_share=0.5, seed=0):
+    """
+    Write a reproducible corpus of synthetic stations.
+
+    Args:
+        raw_path (str): Directory receiving the .zip / .epw files
+        stations (int): Number of stations
+        rows_per_hour (int): Rows per hour, above 1 for sub-hourly data
+        na_rate (float): Share of measurements written as N_A, on every other station
+        zip_share (float): Share of the stations written as .zip, the others as .epw
+        seed (int): Seed of the coordinates and measurements
+
+    Returns:
+        list[str]: Names of the written files
+    """
+    os.makedirs(raw_path, exist_ok=True)
+    latitudes, longitudes, elevations = station_coordinates(stations, seed)
+
+    file_names = []
+    for i in range(stations):
+        city = f"City{i}"
+        base_name = f"USA_ST_{city}.{700000 + i}_TMYx"
+        text = make_epw(
+            city, latitudes[i], longitudes[i], elevations[i], rows_per_hour=rows_per_hour,
+            na_rate=na_rate if i % 2 else 0.0, seed=seed * 1_000_003 + i,
+        )
+
+        if i < round(stations * zip_share):
+            file_name = base_name + ".zip"
+            with zipfile.ZipFile(os.path.join(raw_path, file_name), "w", zipfile.ZIP_DEFLATED) as archive:
+                archive.writestr(base_name + ".epw", text)
+        else:
+            file_name = base_name + ".epw"
+            with open(os.path.join(raw_path, file_name), "w", newline="") as file:
+                file.write(text)
+
+        file_names.append(file_name)
+
+    return file_names
@@ -1,18 +1,23 @@
-from volansarch import *
-import os
+# Explicit imports, a star import would load every module of the package
+from volansarch import EPWFilePreparator
 
-# Loading environment variables
-from dotenv import load_dotenv
+if __name__ == "__main__":
+    data_update = EPWFilePreparator()
 
-data_update = EPWFilePreparator()
+    print(data_update.raw_data_file_names)
 
-print(data_update.raw_data_file_names)
+    # Stations of raw files deleted from the input directory are removed from the output
+    files = data_update.list_files_needed_update(prune=True)
+    for file in data_update.update_plan["removed"]:
+        print(f"Removed - {file}")
 
-for i, file in enumerate(data_update.list_files_needed_update()):
-    data_update.parse_file(file)
-    print (f"File {i + 1} - {file}")
+    # Parsing the new files across all cores, the combined index is updated once at the end
+    result = data_update.parse_many(files)
 
+    for file, error in result["failed"].items():
+        print(f"Failed - {file} - {error}")
 
-# # Select the nearest location sample
-# sample_project = EPWFileselection(lat=43.0, lon=-94.0, max_distance=None, loc_numbers=1)
-# print(sample_project.file_name)
+
+    # # Select the nearest location sample (from volansarch import EPWFileselection)
+    # sample_project = EPWFileselection(lat=43.0, lon=-94.0, max_distance=None, loc_numbers=1)
+    # print(sample_project.file_name)
@@ -0,0 +1,30 @@
+# Shared fixtures, run from the app directory: python -m pytest -q tests
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from volansarch import get_settings
+
+
+@pytest.fixture
+def workspace(tmp_path):
+    # Point the preparator and the selections at an empty workspace, restored afterwards
+    settings = get_settings()
+    previous = dict(settings)
+    settings.update({
+        "EPW_RAW_PATH": str(tmp_path / "raw"),
+        "EPW_PARSED_PATH": str(tmp_path / "parsed"),
+        "EPW_COMBINED_PATH": str(tmp_path / "combined"),
+        "EPW_COMBINED_INDEX_NAME": "index.csv",
+        "EPW_PARSED_FORMAT": None,
+        "EPW_METRICS_LOG": None,
+    })
+    os.makedirs(settings["EPW_RAW_PATH"])
+
+    yield settings
+
+    settings.clear()
+    settings.update(previous)
@@ -0,0 +1,36 @@
+# Small raw files for the tests, built from the benchmark generator
+import io
+import os
+import tarfile
+import zipfile
+
+from benchmarks.synthetic_epw import make_epw
+
+
+def epw_text(city, latitude, longitude, elevation=100.0):
+    return make_epw(city, latitude, longitude, elevation)
+
+
+def write_epw(path, text):
+    with open(path, "w", newline="") as file:
+        file.write(text)
+
+
+def write_zip(path, members):
+    # members: name inside the archive -> EPW text
+    with zipfile.ZipFile(path, "w", zipfile.ZIP_DEFLATED) as archive:
+        for name, text in members.items():
+            archive.writestr(name, text)
+
+
+def write_tar(path, members):
+    with tarfile.open(path, "w:gz") as archive:
+        for name, text in members.items():
+            content = text.encode("utf-8")
+            info = tarfile.TarInfo(name)
+            info.size = len(content)
+            archive.addfile(info, io.BytesIO(content))
+
+
+def raw_path(settings, name):
+    return os.path.join(settings["EPW_RAW_PATH"], name)
@@ -0,0 +1,70 @@
+import os
+
+from volansarch import EPWFilePreparator
+from volansarch.combined_index import read_combined_index
+from volansarch.station_store import load_station
+
+from epw_files import epw_text, write_zip, write_tar, raw_path
+
+STATION = "USA_ST_City0.700000_TMYx"
+
+
+def test_same_member_name_in_two_bundles_keeps_every_station(workspace):
+    write_zip(raw_path(workspace, STATION + ".zip"), {STATION + ".epw": epw_text("Standalone", 30.0, -90.0)})
+    write_zip(raw_path(workspace, "region.zip"), {
+        f"R/{STATION}.epw": epw_text("InZip", 35.0, -95.0),
+        "R/USA_ST_Other.700001_TMYx.epw": epw_text("Other", 36.0, -96.0),
+    })
+    write_tar(raw_path(workspace, "region2.tar.gz"), {f"T/{STATION}.epw": epw_text("InTar", 40.0, -100.0)})
+
+    preparator = EPWFilePreparator()
+    result = preparator.parse_many(preparator.list_files_needed_update(), workers=1, progress=False)
+
+    assert result["failed"] == {}
+    assert len(result["parsed"]) == 4
+
+    index = read_combined_index(os.path.join(workspace["EPW_COMBINED_PATH"], "index.csv"))
+    assert len(index) == 4
+
+    # Every index row reads back its own station
+    for row in index.itertuples():
+        station = load_station(workspace["EPW_PARSED_PATH"], row.file_name)
+        assert station["location"]["city"] == row.city
+        assert station["location"]["latitude"] == row.latitude
+
+    assert sorted(index["city"]) == ["InTar", "InZip", "Other", "Standalone"]
+
+
+def test_duplicate_parsed_name_is_reported_as_failed(workspace):
+    # The .zip and the .epw of the same station would be stored under the same name
+    write_zip(raw_path(workspace, STATION + ".zip"), {STATION + ".epw": epw_text("Zipped", 30.0, -90.0)})
+    with open(raw_path(workspace, STATION + ".epw"), "w", newline="") as file:
+        file.write(epw_text("Plain", 31.0, -91.0))
+
+    preparator = EPWFilePreparator()
+    result = preparator.parse_many(sorted(os.listdir(workspace["EPW_RAW_PATH"])), workers=1, progress=False)
+
+    assert result["parsed"] == [STATION + ".epw"]
+    assert list(result["failed"]) == [STATION + ".zip"]
+    assert "already used" in result["failed"][STATION + ".zip"]
+
+
+def test_changed_bundle_drops_the_members_it_no_longer_holds(workspace):
+    bundle = raw_path(workspace, "region.zip")
+    write_zip(bundle, {"R/USA_ST_A.700001_TMYx.epw": epw_text("A", 30.0, -90.0), "R/USA_ST_B.700002_TMYx.epw": epw_text("B", 31.0, -91.0)})
+
+    preparator = EPWFilePreparator()
+    preparator.parse_many(preparator.list_files_needed_update(), workers=1, progress=False)
+
+    write_zip(bundle, {"R/USA_ST_A.700001_TMYx.epw": epw_text("A", 30.0, -90.0), "R/USA_ST_C.700003_TMYx.epw": epw_text("C", 32.0, -92.0)})
+    os.utime(bundle, ns=(1, 1))
+
+    preparator = EPWFilePreparator()
+    assert preparator.list_files_needed_update() == ["region.zip"]
+    result = preparator.parse_many(["region.zip"], workers=1, progress=False)
+    assert result["failed"] == {}
+
+    index = read_combined_index(os.path.join(workspace["EPW_COMBINED_PATH"], "index.csv"))
+    assert sorted(index["city"]) == ["A", "C"]
+    assert not any(name.startswith("region.zip__R__USA_ST_B") for name in os.listdir(workspace["EPW_PARSED_PATH"]))
+    assert EPWFilePreparator().list_files_needed_update() == []
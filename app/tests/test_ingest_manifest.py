@@ -0,0 +1,47 @@
+import os
+import json
+
+from volansarch import EPWFilePreparator
+from volansarch.combined_index import read_combined_index
+from volansarch.ingest_manifest import MANIFEST_NAME
+from volansarch.weather_aggregates import AGGREGATES_TABLE_NAME
+
+from epw_files import epw_text, write_epw, write_zip, raw_path
+
+
+def test_deleted_raw_files_leave_the_store_and_the_index(workspace):
+    write_epw(raw_path(workspace, "USA_ST_Keep.700000_TMYx.epw"), epw_text("Keep", 30.0, -90.0))
+    write_epw(raw_path(workspace, "USA_ST_Gone.700001_TMYx.epw"), epw_text("Gone", 31.0, -91.0))
+    write_zip(raw_path(workspace, "region.zip"), {
+        "R/USA_ST_A.700002_TMYx.epw": epw_text("A", 32.0, -92.0),
+        "R/USA_ST_B.700003_TMYx.epw": epw_text("B", 33.0, -93.0),
+    })
+
+    preparator = EPWFilePreparator()
+    result = preparator.parse_many(preparator.list_files_needed_update(), workers=1, progress=False)
+    assert len(result["parsed"]) == 4
+
+    os.remove(raw_path(workspace, "USA_ST_Gone.700001_TMYx.epw"))
+    os.remove(raw_path(workspace, "region.zip"))
+
+    # Planning alone leaves the store untouched
+    preparator = EPWFilePreparator()
+    assert preparator.list_files_needed_update() == []
+    assert preparator.update_plan["removed"] == ["USA_ST_Gone.700001_TMYx.epw", "region.zip"]
+    assert len(read_combined_index(os.path.join(workspace["EPW_COMBINED_PATH"], "index.csv"))) == 4
+    assert len(os.listdir(workspace["EPW_PARSED_PATH"])) == 12
+
+    preparator = EPWFilePreparator()
+    assert preparator.list_files_needed_update(prune=True) == []
+    assert preparator.update_plan["removed"] == ["USA_ST_Gone.700001_TMYx.epw", "region.zip"]
+
+    combined_path = workspace["EPW_COMBINED_PATH"]
+    assert read_combined_index(os.path.join(combined_path, "index.csv"))["city"].tolist() == ["Keep"]
+    assert read_combined_index(os.path.join(combined_path, AGGREGATES_TABLE_NAME))["file_name"].str.endswith("Keep.700000_TMYx.epw").tolist() == [True]
+
+    with open(os.path.join(combined_path, MANIFEST_NAME), "r", encoding="utf-8") as file:
+        assert list(json.load(file)) == ["USA_ST_Keep.700000_TMYx.epw"]
+
+    assert sorted(os.listdir(workspace["EPW_PARSED_PATH"])) == [
+        "USA_ST_Keep.700000_TMYx.agg.json", "USA_ST_Keep.700000_TMYx.json", "USA_ST_Keep.700000_TMYx.meta.json",
+    ]
@@ -0,0 +1,144 @@
+import os
+
+import pytest
+
+from volansarch import EPWFilePreparator, weather_data_preparation
+from volansarch.combined_index import read_combined_index
+from volansarch.ingest_manifest import IngestCheckpoint
+from volansarch.utils import station_base_name, atomic_write
+
+from epw_files import epw_text, write_epw, raw_path
+
+STATIONS = [f"USA_ST_City{number}.70000{number}_TMYx" for number in range(4)]
+
+
+class Interrupted(BaseException):
+    # Stands for the process being killed, nothing in the preparator catches it
+    pass
+
+
+def write_stations(workspace):
+    for number, station in enumerate(STATIONS):
+        write_epw(raw_path(workspace, station + ".epw"), epw_text(f"City{number}", 30.0 + number, -90.0 - number))
+
+
+def interrupt_checkpoint_after(monkeypatch, records):
+    # Let the first records reach the checkpoint, the next finished file dies before its record
+    record = IngestCheckpoint.record
+    calls = []
+
+    def interrupted_record(self, file_name, result, source):
+        if len(calls) == records:
+            raise Interrupted()
+        calls.append(file_name)
+        record(self, file_name, result, source)
+
+    monkeypatch.setattr(IngestCheckpoint, "record", interrupted_record)
+    return calls
+
+
+def indexed_stations(workspace):
+    index = read_combined_index(os.path.join(workspace["EPW_COMBINED_PATH"], "index.csv"))
+    return sorted(station_base_name(file) for file in index["file_name"])
+
+
+def test_outputs_written_before_the_checkpoint_are_parsed_again(workspace, monkeypatch):
+    write_stations(workspace)
+    interrupt_checkpoint_after(monkeypatch, 0)
+
+    preparator = EPWFilePreparator()
+    with pytest.raises(Interrupted):
+        preparator.parse_many(preparator.list_files_needed_update(), workers=1, progress=False)
+    monkeypatch.undo()
+
+    # The first station's outputs are on disk, but neither the index nor the checkpoint has it
+    assert os.listdir(workspace["EPW_PARSED_PATH"])
+
+    preparator = EPWFilePreparator()
+    assert sorted(preparator.list_files_needed_update()) == sorted(station + ".epw" for station in STATIONS)
+
+    result = preparator.parse_many(preparator.list_files_needed_update(), workers=1, progress=False)
+    assert result["failed"] == {}
+    assert indexed_stations(workspace) == STATIONS
+    assert EPWFilePreparator().list_files_needed_update() == []
+
+
+def test_single_parse_without_index_update_is_not_adopted(workspace):
+    write_stations(workspace)
+
+    preparator = EPWFilePreparator()
+    preparator.parse_many(preparator.list_files_needed_update(), workers=1, progress=False)
+
+    write_epw(raw_path(workspace, "USA_ST_Late.700009_TMYx.epw"), epw_text("Late", 40.0, -100.0))
+    preparator.parse_file("USA_ST_Late.700009_TMYx.epw", update_index=False)
+
+    assert EPWFilePreparator().list_files_needed_update() == ["USA_ST_Late.700009_TMYx.epw"]
+
+
+def test_resume_only_removes_temporary_files_of_the_interrupted_batch(workspace, monkeypatch):
+    write_stations(workspace)
+    interrupt_checkpoint_after(monkeypatch, 1)
+
+    preparator = EPWFilePreparator()
+    with pytest.raises(Interrupted):
+        preparator.parse_many(preparator.list_files_needed_update(), workers=1, progress=False)
+    monkeypatch.undo()
+
+    # Left over by the interrupted batch, and in flight in another process
+    parsed_path = workspace["EPW_PARSED_PATH"]
+    interrupted_at = os.path.getmtime(os.path.join(workspace["EPW_COMBINED_PATH"], "ingest_checkpoint.jsonl"))
+    left_over = os.path.join(parsed_path, ".left_over.json.1.00000000.tmp")
+    in_flight = os.path.join(parsed_path, ".in_flight.json.2.00000000.tmp")
+    for path in (left_over, in_flight):
+        write_epw(path, "")
+    os.utime(left_over, (interrupted_at - 10, interrupted_at - 10))
+    os.utime(in_flight, (interrupted_at + 10, interrupted_at + 10))
+
+    preparator = EPWFilePreparator()
+    preparator.parse_many(preparator.list_files_needed_update(), workers=1, progress=False)
+
+    assert not os.path.exists(left_over)
+    assert os.path.exists(in_flight)
+
+
+def test_resume_parses_only_the_files_missing_from_the_checkpoint(workspace, monkeypatch):
+    write_stations(workspace)
+    recorded = interrupt_checkpoint_after(monkeypatch, 2)
+
+    preparator = EPWFilePreparator()
+    with pytest.raises(Interrupted):
+        preparator.parse_many(preparator.list_files_needed_update(), workers=1, progress=False)
+    monkeypatch.undo()
+    assert len(recorded) == 2
+
+    parse_for_batch = weather_data_preparation._parse_for_batch
+    parsed = []
+
+    def counted_parse_for_batch(file_name, *args, **kwargs):
+        parsed.append(file_name)
+        return parse_for_batch(file_name, *args, **kwargs)
+
+    monkeypatch.setattr(weather_data_preparation, "_parse_for_batch", counted_parse_for_batch)
+
+    preparator = EPWFilePreparator()
+    result = preparator.parse_many(preparator.list_files_needed_update(), workers=1, progress=False)
+
+    assert sorted(parsed) == sorted(station + ".epw" for station in STATIONS if station + ".epw" not in recorded)
+    assert sorted(result["parsed"]) == sorted(station + ".epw" for station in STATIONS)
+    # Every station once in the index, and the batch committed
+    assert indexed_stations(workspace) == STATIONS
+    assert not os.path.exists(os.path.join(workspace["EPW_COMBINED_PATH"], "ingest_checkpoint.jsonl"))
+    assert EPWFilePreparator().list_files_needed_update() == []
+
+
+def test_failed_atomic_write_keeps_the_previous_file(tmp_path):
+    path = tmp_path / "station.json"
+    path.write_text("previous")
+
+    with pytest.raises(Interrupted):
+        with atomic_write(str(path), "w", encoding="utf-8") as file:
+            file.write("half written")
+            raise Interrupted()
+
+    assert path.read_text() == "previous"
+    assert os.listdir(tmp_path) == ["station.json"]
@@ -0,0 +1,73 @@
+import datetime
+
+import jdatetime
+import numpy as np
+import pytest
+
+from volansarch import jalali_calendar
+from volansarch.jalali_calendar import gregorian_to_jalali
+
+
+def expected(dates):
+    converted = [jdatetime.date.fromgregorian(date=date) for date in dates]
+    return (
+        [date.year for date in converted],
+        [date.month for date in converted],
+        [date.day for date in converted],
+        [date.yday() for date in converted],
+    )
+
+
+def convert(dates):
+    result = gregorian_to_jalali([d.year for d in dates], [d.month for d in dates], [d.day for d in dates])
+    return tuple(result[name].tolist() for name in ("year", "month", "day", "day_of_year"))
+
+
+def day_range(first, last):
+    return [first + datetime.timedelta(days=offset) for offset in range((last - first).days + 1)]
+
+
+@pytest.fixture(autouse=True)
+def fresh_table(monkeypatch):
+    monkeypatch.setattr(jalali_calendar, "_TABLE", None)
+
+
+def test_every_day_matches_jdatetime():
+    # Gregorian and Jalali leap years (e.g. 2000, 2024, Esfand 30 of 1399 and 1403)
+    dates = day_range(datetime.date(1995, 1, 1), datetime.date(2030, 12, 31))
+    assert convert(dates) == expected(dates)
+
+
+def test_dates_outside_the_table_extend_it():
+    first = day_range(datetime.date(2001, 1, 1), datetime.date(2001, 12, 31))
+    assert convert(first) == expected(first)
+
+    # Earlier and later than the table built for 2001, then the 2001 dates again
+    for dates in (day_range(datetime.date(1900, 1, 1), datetime.date(1901, 3, 31)),
+                  day_range(datetime.date(2099, 12, 1), datetime.date(2100, 3, 31)),
+                  first):
+        assert convert(dates) == expected(dates)
+
+
+def test_hourly_rows_in_any_order():
+    dates = [datetime.date(2024, 3, 19), datetime.date(2024, 3, 20), datetime.date(2025, 3, 20), datetime.date(2000, 2, 29)]
+    hours = [1, 24, 12, 5]
+
+    result = gregorian_to_jalali([d.year for d in dates], [d.month for d in dates], [d.day for d in dates], hours, [0, 0, 30, 59])
+    assert tuple(result[name].tolist() for name in ("year", "month", "day", "day_of_year")) == expected(dates)
+
+
+@pytest.mark.parametrize("columns", [
+    ([2001], [2], [29], None, None),
+    ([2001], [13], [1], None, None),
+    ([2001], [1], [1], [25], None),
+    ([2001], [1], [1], [1], [60]),
+])
+def test_invalid_dates_raise(columns):
+    with pytest.raises(ValueError):
+        gregorian_to_jalali(*columns)
+
+
+def test_empty_columns():
+    result = gregorian_to_jalali(np.array([], dtype="int64"), [], [])
+    assert all(len(values) == 0 for values in result.values())
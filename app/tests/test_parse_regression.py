@@ -0,0 +1,45 @@
+import os
+import json
+import shutil
+
+import pytest
+
+from volansarch import EPWFilePreparator
+from volansarch.station_store import load_station
+
+DATA_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data")
+
+# Two days of 30-minute rows with N_A gaps; the expected file was written by the
+# row-by-row parser the columnar one replaced, with file_name reduced to the bare name
+STATION = "IRN_TH_Regress.407540_TMYx"
+
+
+@pytest.fixture
+def raw_station(workspace):
+    shutil.copy(os.path.join(DATA_PATH, STATION + ".epw"), workspace["EPW_RAW_PATH"])
+    return os.path.join(workspace["EPW_RAW_PATH"], STATION + ".epw")
+
+
+def test_json_output_matches_the_row_by_row_parser(workspace, raw_station):
+    EPWFilePreparator().parse_file(STATION + ".epw", output_format="json")
+
+    with open(os.path.join(workspace["EPW_PARSED_PATH"], STATION + ".json"), "r") as file:
+        output = file.read()
+    output = output.replace(json.dumps(raw_station), json.dumps(STATION + ".epw"), 1)
+
+    with open(os.path.join(DATA_PATH, STATION + ".expected.json"), "r") as file:
+        expected = file.read()
+
+    assert output == expected
+
+
+@pytest.mark.parametrize("output_format", ["npz", "columnar"])
+def test_other_formats_load_the_same_rows(workspace, raw_station, output_format):
+    EPWFilePreparator().parse_file(STATION + ".epw", output_format=output_format)
+    station = load_station(workspace["EPW_PARSED_PATH"], raw_station)
+
+    with open(os.path.join(DATA_PATH, STATION + ".expected.json"), "r") as file:
+        expected = json.load(file)
+
+    assert station["weather_data"] == expected["weather_data"]
+    assert station["metadata"] == expected["metadata"]
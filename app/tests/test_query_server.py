@@ -0,0 +1,54 @@
+import os
+import json
+import threading
+import urllib.request
+from urllib.error import HTTPError
+
+import pytest
+
+from volansarch import StationCatalog
+from volansarch.combined_index import INDEX_COLUMNS
+from volansarch.query_server import StationQueryServer
+
+
+@pytest.fixture
+def server(workspace):
+    server = StationQueryServer(("127.0.0.1", 0), catalog=StationCatalog(), quiet=True)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+
+    yield server
+
+    server.shutdown()
+    server.server_close()
+
+
+def get(server, path):
+    # Status and JSON body of a request, error statuses included
+    url = f"http://127.0.0.1:{server.server_address[1]}{path}"
+    try:
+        with urllib.request.urlopen(url) as response:
+            return response.status, json.loads(response.read())
+    except HTTPError as error:
+        return error.code, json.loads(error.read())
+
+
+@pytest.mark.parametrize("path", ["/nearest?lat=35&lon=51", "/columns?lat=35&lon=51&format=json", "/health"])
+def test_missing_index_is_503(server, path):
+    status, body = get(server, path)
+
+    assert status == 503
+    assert "does not exist" in body["error"]
+
+
+@pytest.mark.parametrize("path", ["/columns?lat=35&lon=51&format=json", "/metadata?lat=35&lon=51"])
+def test_empty_index_is_404(server, workspace, path):
+    os.makedirs(workspace["EPW_COMBINED_PATH"])
+    with open(os.path.join(workspace["EPW_COMBINED_PATH"], "index.csv"), "w") as file:
+        file.write(",".join(INDEX_COLUMNS) + "\n")
+
+    status, body = get(server, path)
+
+    assert status == 404
+    assert "No station" in body["error"]
+    assert get(server, "/nearest?lat=35&lon=51") == (200, [])
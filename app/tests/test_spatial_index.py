@@ -0,0 +1,120 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from volansarch import spatial_index
+from volansarch.combined_index import INDEX_COLUMNS
+from volansarch.spatial_index import StationSpatialIndex, haversine, SPATIAL_INDEX_SUFFIX
+
+QUERIES = [(35.7, 51.4), (-33.9, 151.2), (89.5, 0.0), (0.0, 179.9), (0.0, -179.9), (-60.0, -70.0)]
+
+
+@pytest.fixture
+def index_path(tmp_path):
+    # Random stations, a quarter of them repeated at the same location with an older year_end
+    rng = np.random.default_rng(11)
+    count = 400
+    latitudes = np.degrees(np.arcsin(rng.uniform(-1, 1, count))).round(3)
+    longitudes = rng.uniform(-180, 180, count).round(3)
+
+    rows = []
+    for i in range(count):
+        rows.append([f"S{i}.epw", f"City{i}", "ST", "USA", latitudes[i], longitudes[i], 10.0, 1990, 2010 + i % 7])
+        if i % 4 == 0:
+            rows.append([f"S{i}_old.epw", f"City{i}", "ST", "USA", latitudes[i], longitudes[i], 10.0, 1980, 2000])
+
+    path = str(tmp_path / "index.csv")
+    pd.DataFrame(rows, columns=INDEX_COLUMNS).to_csv(path, index=False)
+    return path
+
+
+def brute_force(index_path, lat, lon, loc_numbers, max_distance=None):
+    # Latest station per location, then every distance
+    df = pd.read_csv(index_path)
+    latest = df.loc[df.groupby(["latitude", "longitude"])["year_end"].idxmax()]
+    distances = [haversine(lat, lon, a, b) for a, b in zip(latest["latitude"], latest["longitude"])]
+    ranked = sorted(zip(distances, latest["file_name"]))
+
+    if max_distance is not None:
+        ranked = [item for item in ranked if item[0] <= ranked[0][0] + max_distance]
+
+    return [file_name for _, file_name in ranked[:loc_numbers]], [distance for distance, _ in ranked[:loc_numbers]]
+
+
+@pytest.fixture(params=["kdtree", "scan"])
+def search(request, monkeypatch):
+    # KD-tree from the first query, or a vectorized scan without scipy
+    if request.param == "kdtree":
+        monkeypatch.setattr(spatial_index, "SCAN_QUERIES_BEFORE_TREE", 0)
+    else:
+        monkeypatch.setattr(spatial_index, "_CKDTREE", False)
+    return request.param
+
+
+@pytest.mark.parametrize("loc_numbers, max_distance", [(1, None), (5, None), (20, None), (20, 500.0), (8, 0.0)])
+def test_nearest_matches_a_haversine_scan(index_path, search, loc_numbers, max_distance):
+    index = StationSpatialIndex.load_or_build(index_path)
+    assert len(index) == 400
+    assert not index.stations["file_name"].str.endswith("_old.epw").any()
+
+    for lat, lon in QUERIES:
+        nearest = index.nearest(lat, lon, loc_numbers, max_distance)
+        file_names, distances = brute_force(index_path, lat, lon, loc_numbers, max_distance)
+
+        assert nearest["file_name"].tolist() == file_names
+        assert nearest["distance_km"].tolist() == distances
+
+
+def test_within_matches_a_haversine_scan(index_path, search):
+    index = StationSpatialIndex.load_or_build(index_path)
+
+    for lat, lon in QUERIES:
+        within = index.within(lat, lon, 1500.0)
+        file_names, distances = brute_force(index_path, lat, lon, 400)
+        assert within["file_name"].tolist() == [name for name, d in zip(file_names, distances) if d <= 1500.0]
+
+
+def test_nearest_many_matches_nearest(index_path, search):
+    index = StationSpatialIndex.load_or_build(index_path)
+    lats, lons = zip(*QUERIES)
+
+    many = index.nearest_many(lats, lons, loc_numbers=[1, 3, 5, 7, 9, 11], max_distance=[np.nan, 800.0, np.nan, 0.0, 2000.0, np.nan])
+
+    for site, (lat, lon) in enumerate(QUERIES):
+        loc_numbers = [1, 3, 5, 7, 9, 11][site]
+        max_distance = [None, 800.0, None, 0.0, 2000.0, None][site]
+        nearest = index.nearest(lat, lon, loc_numbers, max_distance)
+        rows = many[many["site"] == site]
+
+        assert rows["file_name"].tolist() == nearest["file_name"].tolist()
+        np.testing.assert_allclose(rows["distance_km"], nearest["distance_km"], rtol=1e-12)
+
+
+def test_persisted_index_gives_the_same_answers(index_path, monkeypatch):
+    built = StationSpatialIndex.load_or_build(index_path)
+    assert os.path.exists(index_path + SPATIAL_INDEX_SUFFIX)
+
+    # Answered from the .spatial.npz alone, the CSV is not read again
+    def no_csv(path):
+        raise AssertionError("combined index read")
+
+    monkeypatch.setattr(spatial_index, "read_combined_index", no_csv)
+    loaded = StationSpatialIndex.load_or_build(index_path)
+
+    pd.testing.assert_frame_equal(built.stations, loaded.stations)
+    for lat, lon in QUERIES:
+        pd.testing.assert_frame_equal(built.nearest(lat, lon, 10), loaded.nearest(lat, lon, 10))
+        pd.testing.assert_frame_equal(built.within(lat, lon, 1000.0), loaded.within(lat, lon, 1000.0))
+
+
+def test_persisted_index_is_rebuilt_when_the_index_changes(index_path):
+    StationSpatialIndex.load_or_build(index_path)
+
+    df = pd.read_csv(index_path)
+    df = pd.concat([df, pd.DataFrame([["New.epw", "New", "ST", "USA", 35.7, 51.4, 10.0, 1990, 2030]], columns=INDEX_COLUMNS)])
+    df.to_csv(index_path, index=False)
+    os.utime(index_path, ns=(1, 1))
+
+    assert StationSpatialIndex.load_or_build(index_path).nearest(35.7, 51.4)["file_name"].tolist() == ["New.epw"]
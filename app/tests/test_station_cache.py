@@ -0,0 +1,33 @@
+from volansarch import EPWFilePreparator, EPWFileselection, StationCache
+
+from epw_files import epw_text, write_epw, raw_path
+
+
+def ingest(workspace):
+    write_epw(raw_path(workspace, "USA_ST_City0.700000_TMYx.epw"), epw_text("City0", 35.7, 51.4))
+    preparator = EPWFilePreparator()
+    preparator.parse_many(preparator.list_files_needed_update(), workers=1, progress=False)
+
+
+def test_selections_own_their_data_by_default(workspace):
+    ingest(workspace)
+
+    first = EPWFileselection(35.7, 51.4)
+    first.data["weather_data_0"][0]["Dry_Bulb_Temperature"] = 999
+    first.metadata["metadata_0"]["year_start"] = 0
+
+    second = EPWFileselection(35.7, 51.4)
+    assert second.data["weather_data_0"] is not first.data["weather_data_0"]
+    assert second.data["weather_data_0"][0]["Dry_Bulb_Temperature"] != 999
+    assert second.metadata["metadata_0"]["year_start"] != 0
+
+
+def test_selections_share_an_explicit_cache(workspace):
+    ingest(workspace)
+    cache = StationCache()
+
+    first = EPWFileselection(35.7, 51.4, cache=cache)
+    second = EPWFileselection(35.7, 51.4, cache=cache)
+
+    assert second.data["weather_data_0"] is first.data["weather_data_0"]
+    assert cache.stats()["hits"] == 1
@@ -0,0 +1,35 @@
+import os
+import shutil
+
+import pytest
+
+from volansarch import EPWFilePreparator
+from volansarch.station_store import select_station_columns
+
+DATA_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data")
+STATION = "IRN_TH_Regress.407540_TMYx.epw"
+
+
+@pytest.fixture(params=["json", "npz", "columnar"])
+def parsed_station(request, workspace):
+    shutil.copy(os.path.join(DATA_PATH, STATION), workspace["EPW_RAW_PATH"])
+    EPWFilePreparator().parse_file(STATION, output_format=request.param)
+    return workspace["EPW_PARSED_PATH"], os.path.join(workspace["EPW_RAW_PATH"], STATION)
+
+
+def test_select_window(parsed_station):
+    # The fixture covers January 1 and 2
+    columns = select_station_columns(*parsed_station, ["Day", "Hour"], start=(1, 2), end=(1, 2, 12))
+
+    assert set(columns["Day"].tolist()) == {2}
+    assert columns["Hour"].tolist() == [hour for hour in range(1, 13) for _ in range(2)]
+
+
+def test_empty_window_bounds_are_open_ends(parsed_station):
+    everything = select_station_columns(*parsed_station, ["Day", "Hour", "Minute"])
+    open_start = select_station_columns(*parsed_station, ["Day", "Hour", "Minute"], start=(), end=(1, 1, 24))
+    open_both = select_station_columns(*parsed_station, ["Day", "Hour", "Minute"], start=(), end=())
+
+    assert len(open_start["Day"]) == 48
+    for name in everything:
+        assert everything[name].tolist() == open_both[name].tolist()
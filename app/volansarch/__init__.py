@@ -1,3 +1,36 @@
-from .utils import get_files_in_directory
-from .weather_data_preparation import EPWFilePreparator
-from .nearest_loction import EPWFileselection
\ No newline at end of file
+# Public names are imported on first access (PEP 562), so importing the package
+# does not load pandas, numpy, scipy or jdatetime until something needs them
+import importlib
+
+_EXPORTS = {
+    "get_files_in_directory": ".utils",
+    "EPWFilePreparator": ".weather_data_preparation",
+    "EPWFileselection": ".nearest_loction",
+    "StationCatalog": ".station_catalog",
+    "StationData": ".station_data",
+    "AsyncEPWFileselection": ".async_selection",
+    "StationCache": ".station_cache",
+    "default_station_cache": ".station_cache",
+    "MetricsCollector": ".instrumentation",
+    "add_sink": ".instrumentation",
+    "remove_sink": ".instrumentation",
+    "get_settings": ".settings",
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+    value = getattr(importlib.import_module(module, __name__), name)
+    # Cached, later accesses skip __getattr__
+    globals()[name] = value
+
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
@@ -0,0 +1,146 @@
+# Asyncio front end of EPWFileselection
+import asyncio
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+
+import pandas as pd
+
+from .nearest_loction import EPWFileselection
+from .station_store import select_station_columns
+from .weather_data_columns import weather_columns_to_records
+
+# Threads of the shared I/O pool, bounds the blocking reads in flight across all requests
+DEFAULT_IO_WORKERS = min(32, (os.cpu_count() or 1) + 4)
+
+_IO_EXECUTOR = None
+_IO_EXECUTOR_LOCK = threading.Lock()
+
+
+def io_executor():
+    # Shared bounded thread pool, created on first use
+    global _IO_EXECUTOR
+
+    with _IO_EXECUTOR_LOCK:
+        if _IO_EXECUTOR is None:
+            _IO_EXECUTOR = ThreadPoolExecutor(max_workers=DEFAULT_IO_WORKERS, thread_name_prefix="volansarch-io")
+
+    return _IO_EXECUTOR
+
+
+class AsyncEPWFileselection:
+    """
+    Non-blocking variant of EPWFileselection for asyncio services.
+
+    The index lookup and every station read run on a bounded thread pool, and the
+    stations of a request are read concurrently, so the event loop never blocks on
+    file I/O. Cancelling a call (e.g. through asyncio.wait_for or a client disconnect)
+    cancels the reads that have not started yet; reads already running finish in
+    their thread and are discarded. Pass a shared StationCatalog to skip reloading
+    the combined index on every request.
+
+    Args:
+        lat (float): Latitude of the site
+        lon (float): Longitude of the site
+        max_distance (float, optional): See EPWFileselection
+        loc_numbers (int): Number of stations to select
+        catalog (StationCatalog, optional): Shared, preprocessed combined index
+        executor (concurrent.futures.Executor, optional): Pool running the blocking
+            reads, the shared io_executor() when omitted
+        cache (StationCache, optional): See EPWFileselection
+
+    Example:
+        selection = await AsyncEPWFileselection.create(35.7, 51.4, loc_numbers=3, catalog=catalog)
+        data = await selection.data()
+    """
+
+    def __init__(self, lat, lon, max_distance=None, loc_numbers=1, catalog=None, executor=None, cache=None):
+        # No I/O here, the index lookup happens in create() / find_nearest_location()
+        self.lat = lat
+        self.lon = lon
+        self.max_distance = max_distance
+        self.loc_numbers = loc_numbers
+        self.catalog = catalog
+        self.executor = executor
+        self.cache = cache
+        self.selection = None
+        self._datasets = {}
+
+    @classmethod
+    async def create(cls, lat, lon, max_distance=None, loc_numbers=1, catalog=None, executor=None, cache=None):
+        self = cls(lat, lon, max_distance, loc_numbers, catalog, executor, cache)
+        await self.find_nearest_location()
+        return self
+
+    async def _run(self, function, *args, **kwargs):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor or io_executor(), partial(function, *args, **kwargs))
+
+    async def _gather(self, calls):
+        # Run the calls concurrently; on error or cancellation the pending ones are cancelled
+        tasks = [asyncio.ensure_future(self._run(*call)) for call in calls]
+        try:
+            return await asyncio.gather(*tasks)
+        except BaseException:
+            for task in tasks:
+                task.cancel()
+            raise
+
+    async def find_nearest_location(self):
+        if self.selection is None:
+            self.selection = await self._run(
+                EPWFileselection, self.lat, self.lon, self.max_distance, self.loc_numbers, self.catalog, self.cache
+            )
+
+        return self.selection.n_nearest_locations
+
+    async def _file_names(self):
+        nearest = await self.find_nearest_location()
+        return nearest["file_name"].tolist()
+
+    async def _per_station(self, key, function, *args, cache=True):
+        # One call per selected station, keyed "<key>_<i>" like EPWFileselection
+        if cache and key in self._datasets:
+            return self._datasets[key]
+
+        file_names = await self._file_names()
+        results = await self._gather([(function, file_name, *args) for file_name in file_names])
+        datasets = {key + "_" + str(i): result for i, result in enumerate(results)}
+
+        if cache:
+            self._datasets[key] = datasets
+
+        return datasets
+
+    async def file_name(self):
+        return await self._per_station("file_name", self._station_field, "file_name")
+
+    async def metadata(self):
+        return await self._per_station("metadata", self._station_field, "metadata")
+
+    async def data(self):
+        return await self._per_station("weather_data", self._station_field, "weather_data")
+
+    async def station_data(self):
+        return await self._per_station("station_data", self._station_data)
+
+    async def aggregates(self):
+        return await self._per_station("aggregates", self._aggregates)
+
+    async def select(self, fields=None, start=None, end=None):
+        # See EPWFileselection.select, not cached since it depends on the arguments
+        return await self._per_station("weather_data", self._select, fields, start, end, cache=False)
+
+    def _station_field(self, file_name, field):
+        return self.selection.load_station_field(file_name, field)
+
+    def _station_data(self, file_name):
+        return self.selection.load_station_data(file_name)
+
+    def _aggregates(self, file_name):
+        return self.selection.load_station_aggregates(file_name)
+
+    def _select(self, file_name, fields, start, end):
+        columns = select_station_columns(self.selection.settings["EPW_PARSED_PATH"], file_name, fields, start, end)
+        return weather_columns_to_records(pd.DataFrame(columns))
@@ -0,0 +1,166 @@
+# Combined index of all parsed stations
+import io
+import os
+import json
+import pandas as pd
+
+from .instrumentation import stage
+from .utils import atomic_write
+
+INDEX_COLUMNS = [
+    "file_name", "city", "state_province", "country",
+    "latitude", "longitude", "elevation_meters",
+    "year_start", "year_end"
+]
+
+JOURNAL_SUFFIX = ".journal"
+
+
+class CombinedIndexWriter:
+    """
+    Append-only writer for the combined index.
+
+    New entries are buffered and journaled to "<index>.journal" as JSON lines, which
+    costs O(1) per file instead of a full CSV rewrite. compact() folds the journal
+    into the canonical CSV once per batch (or on demand). An entry for a file that is
+    already indexed replaces the old one, as a re-parse always did.
+
+    Args:
+        index_path (str): Path of the combined index CSV
+    """
+
+    def __init__(self, index_path):
+        self.index_path = index_path
+        self.journal_path = index_path + JOURNAL_SUFFIX
+        self.pending = []
+
+    def add(self, entry):
+        self.pending.append(entry)
+
+    def add_many(self, entries):
+        self.pending.extend(entries)
+
+    def flush(self):
+        # Append the buffered entries to the journal
+        if not self.pending:
+            return
+
+        os.makedirs(os.path.dirname(self.index_path), exist_ok=True)
+        with open(self.journal_path, "a+b") as file:
+            # A line cut short by an interrupted run is ended first, so it does not swallow the next entry
+            if file.tell() and not _ends_with_newline(file):
+                file.write(b"\n")
+            file.write("".join(json.dumps(entry) + "\n" for entry in self.pending).encode("utf-8"))
+
+        self.pending = []
+
+    def compact(self):
+        # Rewrite the CSV with the journal folded in, then drop the journal
+        self.flush()
+
+        if not os.path.exists(self.journal_path):
+            return
+
+        self._rewrite()
+
+    def remove(self, file_names):
+        # Drop the entries of these files, folding the journal in as compact() does
+        self.flush()
+
+        if not os.path.exists(self.index_path) and not os.path.exists(self.journal_path):
+            return
+
+        self._rewrite(set(file_names))
+
+    def _rewrite(self, removed=()):
+        with stage("index.compact", index=os.path.basename(self.index_path)) as timer:
+            summary_df = read_combined_index(self.index_path)
+            if removed:
+                summary_df = summary_df[~summary_df["file_name"].isin(removed)]
+
+            os.makedirs(os.path.dirname(self.index_path), exist_ok=True)
+            # The CSV is replaced in one step; entries still in the journal if we stop before
+            # removing it are folded in again, which gives the same index
+            with atomic_write(self.index_path, "w", encoding="utf-8", newline="") as file:
+                summary_df.to_csv(file, index=False)
+            if os.path.exists(self.journal_path):
+                os.remove(self.journal_path)
+
+            if timer.active:
+                timer.add(rows=len(summary_df), bytes_written=os.path.getsize(self.index_path))
+
+
+def _ends_with_newline(file):
+    file.seek(-1, os.SEEK_END)
+    return file.read(1) == b"\n"
+
+
+def read_journal(journal_path):
+    """
+    Read the entries of an index journal in write order.
+
+    A line cut short by an interrupted write is skipped.
+
+    Args:
+        journal_path (str): Path of the journal
+
+    Returns:
+        list[dict]: Journaled index entries
+    """
+    entries = []
+
+    if not os.path.exists(journal_path):
+        return entries
+
+    with open(journal_path, "r", encoding="utf-8") as file:
+        for line in file:
+            try:
+                entries.append(json.loads(line))
+            except json.JSONDecodeError:
+                continue
+
+    return entries
+
+
+def read_combined_index(index_path):
+    """
+    Read the combined index including entries not yet compacted into the CSV.
+
+    Args:
+        index_path (str): Path of the combined index CSV
+
+    Returns:
+        pd.DataFrame: One row per indexed file, with INDEX_COLUMNS
+
+    Raises:
+        FileNotFoundError: If neither the CSV nor its journal exist
+    """
+    journal_path = index_path + JOURNAL_SUFFIX
+    csv_exists = os.path.exists(index_path)
+
+    if not csv_exists and not os.path.exists(journal_path):
+        raise FileNotFoundError(f"Combined index '{index_path}' does not exist")
+
+    if csv_exists:
+        with stage("index.read", index=os.path.basename(index_path)) as timer:
+            summary_df = pd.read_csv(index_path)
+            if timer.active:
+                timer.add(rows=len(summary_df), bytes_read=os.path.getsize(index_path))
+    else:
+        summary_df = pd.DataFrame(columns=INDEX_COLUMNS)
+
+    entries = read_journal(journal_path)
+    if not entries:
+        return summary_df
+
+    journal_df = pd.DataFrame(entries).drop_duplicates(subset=["file_name"], keep="last")
+
+    # Drop any existing entry for these files (in case of re-parse) and append the new ones
+    summary_df = summary_df[~summary_df["file_name"].isin(journal_df["file_name"])]
+    if summary_df.empty:
+        summary_df = journal_df
+    else:
+        summary_df = pd.concat([summary_df, journal_df], ignore_index=True)
+
+    # Round trip through CSV so the column types match the compacted file
+    return pd.read_csv(io.StringIO(summary_df.to_csv(index=False)))
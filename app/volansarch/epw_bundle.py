@@ -0,0 +1,82 @@
+# Bundle archives holding many stations (regional .zip / .tar.gz downloads)
+import io
+import os
+import tarfile
+import zipfile
+
+# Always bundles; a .zip is a bundle when it holds more than one station
+TAR_BUNDLE_EXTENSIONS = (".tar.gz", ".tgz")
+
+
+def _is_station_member(name):
+    # .epw files and nested per-station .zip files, without macOS resource forks
+    base_name = name.replace("\\", "/").split("/")[-1]
+    return not base_name.startswith(".") and not name.startswith("__MACOSX/") and base_name.endswith((".epw", ".zip"))
+
+
+def is_bundle(path):
+    """
+    Tell whether a raw file is a bundle of stations rather than a single station.
+
+    A .tar.gz / .tgz is always a bundle. A .zip is one when it holds several .epw
+    files or nested .zip files; the usual station .zip (one .epw next to its .ddy,
+    .stat, ...) is not. Only the central directory of a .zip is read.
+
+    Args:
+        path (str): Path of the raw file
+
+    Returns:
+        bool: True for a bundle
+    """
+    if path.lower().endswith(TAR_BUNDLE_EXTENSIONS):
+        return True
+
+    if os.path.splitext(path)[-1].lower() != ".zip":
+        return False
+
+    try:
+        with zipfile.ZipFile(path, "r") as archive:
+            members = [name for name in archive.namelist() if _is_station_member(name)]
+    except zipfile.BadZipFile:
+        # Reported by the single-file parse
+        return False
+
+    return len(members) > 1 or any(name.endswith(".zip") for name in members)
+
+
+def iter_bundle_members(path):
+    """
+    Stream the EPW content of every station of a bundle in one pass over the archive.
+
+    Nothing is extracted to disk. The .zip central directory is read once for the
+    whole bundle, and a .tar.gz is decompressed sequentially as a stream. A nested
+    station .zip yields the first .epw it holds, like EPWReader.
+
+    Args:
+        path (str): Path of the .zip / .tar.gz / .tgz bundle
+
+    Yields:
+        tuple[str, bytes]: Member name (path of the .epw inside the bundle) and its content
+    """
+    if path.lower().endswith(TAR_BUNDLE_EXTENSIONS):
+        with tarfile.open(path, "r|*") as archive:
+            for member in archive:
+                if member.isfile() and _is_station_member(member.name):
+                    yield from _station_content(member.name, archive.extractfile(member).read())
+    else:
+        with zipfile.ZipFile(path, "r") as archive:
+            for info in archive.infolist():
+                if not info.is_dir() and _is_station_member(info.filename):
+                    yield from _station_content(info.filename, archive.read(info))
+
+
+def _station_content(name, content):
+    if not name.endswith(".zip"):
+        yield name, content
+        return
+
+    with zipfile.ZipFile(io.BytesIO(content), "r") as station:
+        epw_file = next((f for f in station.namelist() if f.endswith(".epw")), None)
+        if epw_file is not None:
+            directory = os.path.dirname(name.replace("\\", "/"))
+            yield (directory + "/" if directory else "") + os.path.basename(epw_file), station.read(epw_file)
@@ -0,0 +1,140 @@
+# Streaming reader for EPW files
+import io
+import os
+import zipfile
+from itertools import islice
+
+import pandas as pd
+
+from .weather_data_columns import parse_weather_columns, WEATHER_FIELD_NAMES
+from .instrumentation import stage
+
+# Number of header lines before the hourly data
+HEADER_LINES = 8
+
+# Rows per chunk, one year of hourly data
+DEFAULT_CHUNK_ROWS = 8760
+
+
+class EPWReader:
+    """
+    Stream an EPW file: the 8 header lines first, then the data rows in fixed-size chunks.
+
+    The source is read lazily straight from the .epw file or the first .epw member of a
+    .zip, so memory stays bounded by one chunk however long the file is (multi-year or
+    sub-hourly data). Use it as a context manager.
+
+    Args:
+        source (str | file object): Path of a .zip or .epw file, or an open binary
+            handle on EPW content (e.g. an archive member)
+
+    Example:
+        with EPWReader(path) as reader:
+            location_row = reader.header[0].split(",")
+            for chunk in reader.chunks(24 * 31):
+                ...
+    """
+
+    def __init__(self, source):
+        self.source = source
+        self._zip = None
+        self._stream = None
+        self.header = None
+
+    def __enter__(self):
+        self.open()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def open(self):
+        source = self.source
+
+        if not isinstance(source, (str, os.PathLike)):
+            # Binary handle, decoded like a zip member
+            self._stream = io.TextIOWrapper(source, encoding="utf-8", newline="")
+
+        elif os.path.splitext(source)[-1] == ".zip":
+            self._zip = zipfile.ZipFile(source, "r")
+            # Filter for .epw files
+            epw_file = next((f for f in self._zip.namelist() if f.endswith('.epw')), None)
+            if epw_file is None:
+                self.close()
+                raise ValueError(f"No .epw file found in '{source}'")
+            self._stream = io.TextIOWrapper(self._zip.open(epw_file), encoding="utf-8", newline="")
+
+        elif os.path.splitext(source)[-1] == ".epw":
+            self._stream = open(source, 'r')
+
+        else:
+            raise ValueError("Unsupported file format. Only .zip and .epw files are allowed.")
+
+        self.header = list(islice(self._stream, HEADER_LINES))
+        if len(self.header) < HEADER_LINES:
+            self.close()
+            raise ValueError(f"EPW header is incomplete: {len(self.header)} of {HEADER_LINES} lines")
+
+    def close(self):
+        if self._stream is not None:
+            self._stream.close()
+            self._stream = None
+        if self._zip is not None:
+            self._zip.close()
+            self._zip = None
+
+    def lines(self, chunk_rows=DEFAULT_CHUNK_ROWS):
+        """
+        Yield the raw data lines in lists of at most chunk_rows.
+        """
+        while True:
+            chunk = list(islice(self._stream, chunk_rows))
+            if not chunk:
+                return
+            yield chunk
+
+    def chunks(self, chunk_rows=DEFAULT_CHUNK_ROWS):
+        """
+        Yield the data rows as typed column chunks (see parse_weather_columns).
+        """
+        lines = self.lines(chunk_rows)
+        while True:
+            # Decompression and UTF-8 decoding happen while the lines are read
+            with stage("epw.read_lines") as timer:
+                chunk = next(lines, None)
+                if timer.active and chunk is not None:
+                    timer.add(rows=len(chunk), chars=sum(len(line) for line in chunk))
+            if chunk is None:
+                return
+
+            # Skip chunks made only of blank lines (e.g. trailing newlines)
+            if any(line.strip() for line in chunk):
+                with stage("epw.parse_columns", rows=len(chunk)):
+                    columns = parse_weather_columns(chunk)
+                yield columns
+
+    def read_columns(self, chunk_rows=DEFAULT_CHUNK_ROWS):
+        """
+        Read all remaining data rows into one frame of typed columns.
+        """
+        chunks = list(self.chunks(chunk_rows))
+        if not chunks:
+            return pd.DataFrame({name: [] for name in WEATHER_FIELD_NAMES})
+
+        return pd.concat(chunks, ignore_index=True)
+
+
+def iter_epw_chunks(source, chunk_rows=DEFAULT_CHUNK_ROWS):
+    """
+    Stream an EPW file as (header, chunk) pairs without holding the whole file.
+
+    Args:
+        source (str | file object): Path of a .zip or .epw file, or a binary handle
+        chunk_rows (int): Maximum number of rows per chunk
+
+    Yields:
+        tuple[list[str], pd.DataFrame]: The header lines and the next chunk of typed columns
+    """
+    with EPWReader(source) as reader:
+        for chunk in reader.chunks(chunk_rows):
+            yield reader.header, chunk
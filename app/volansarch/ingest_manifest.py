@@ -0,0 +1,228 @@
+# Manifest of ingested raw files, used to find what needs parsing
+import os
+import json
+import hashlib
+
+from .utils import atomic_write
+
+MANIFEST_NAME = "ingest_manifest.json"
+CHECKPOINT_NAME = "ingest_checkpoint.jsonl"
+
+# Raw file formats the preparator can parse, .tar.gz / .tgz are bundles of stations
+RAW_EXTENSIONS = (".zip", ".epw", ".tar.gz", ".tgz")
+
+
+def is_raw_file(file_name):
+    # Checked on the full suffix, splitext only sees the ".gz" of ".tar.gz"
+    return file_name.lower().endswith(RAW_EXTENSIONS)
+
+
+def file_fingerprint(file_path, with_hash=True):
+    """
+    Size, modification time and (optionally) SHA-256 of a file.
+
+    Args:
+        file_path (str): Path of the file
+        with_hash (bool): Also hash the content
+
+    Returns:
+        dict: "size", "mtime_ns" and "sha256" (None when not hashed)
+    """
+    stat = os.stat(file_path)
+    fingerprint = {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns, "sha256": None}
+
+    if with_hash:
+        digest = hashlib.sha256()
+        with open(file_path, "rb") as file:
+            for block in iter(lambda: file.read(1 << 20), b""):
+                digest.update(block)
+        fingerprint["sha256"] = digest.hexdigest()
+
+    return fingerprint
+
+
+class IngestManifest:
+    """
+    Persisted record of every ingested raw file, keyed by file name.
+
+    Each entry holds the size, mtime and content hash of the raw file as it was when it
+    was parsed. diff() compares the raw directory against it with set operations and
+    only hashes files whose size or mtime moved, so planning a refresh of thousands of
+    files is a directory scan plus dict lookups.
+
+    Args:
+        manifest_path (str): Path of the manifest JSON file
+    """
+
+    def __init__(self, manifest_path):
+        self.manifest_path = manifest_path
+        self.entries = {}
+        self.modified = False
+
+        if os.path.exists(manifest_path):
+            with open(manifest_path, "r", encoding="utf-8") as file:
+                self.entries = json.load(file)
+
+    def save(self):
+        os.makedirs(os.path.dirname(self.manifest_path), exist_ok=True)
+        with atomic_write(self.manifest_path, "w", encoding="utf-8") as file:
+            json.dump(self.entries, file)
+        self.modified = False
+
+    def exists(self):
+        return os.path.exists(self.manifest_path)
+
+    def create(self):
+        # Written (empty) before the first parsed output, so a store without a manifest
+        # is one that was filled before the manifest existed
+        if not self.exists():
+            self.save()
+
+    def record(self, file_name, fingerprint):
+        self.entries[file_name] = fingerprint
+        self.modified = True
+
+    def forget(self, file_name):
+        if self.entries.pop(file_name, None) is not None:
+            self.modified = True
+
+    def diff(self, raw_path, parsed_base_names=()):
+        """
+        Compare the raw directory with the manifest.
+
+        Raw files missing from the manifest whose base name is in parsed_base_names
+        (ingested before the manifest existed) are adopted as unchanged.
+
+        Args:
+            raw_path (str): Directory of the raw .zip / .epw / .tar.gz files
+            parsed_base_names (set[str]): Base names of the stations to adopt, see
+                EPWFilePreparator.list_files_needed_update
+
+        Returns:
+            dict: Sorted lists of file names under "added", "changed", "removed" and "unchanged"
+        """
+        added, changed, unchanged = [], [], []
+        raw_names = set()
+
+        with os.scandir(raw_path) as scan:
+            for item in scan:
+                if not item.is_file() or not is_raw_file(item.name):
+                    continue
+                raw_names.add(item.name)
+
+                entry = self.entries.get(item.name)
+                stat = item.stat()
+
+                if entry is None:
+                    if os.path.splitext(item.name)[0] in parsed_base_names:
+                        self.record(item.name, file_fingerprint(item.path, with_hash=False))
+                        unchanged.append(item.name)
+                    else:
+                        added.append(item.name)
+
+                elif entry["size"] == stat.st_size and entry["mtime_ns"] == stat.st_mtime_ns:
+                    unchanged.append(item.name)
+
+                else:
+                    # Size or mtime moved, the hash decides (a plain touch is not a change)
+                    fingerprint = file_fingerprint(item.path)
+                    if entry.get("sha256") is not None and entry["sha256"] == fingerprint["sha256"]:
+                        self.record(item.name, fingerprint)
+                        unchanged.append(item.name)
+                    else:
+                        changed.append(item.name)
+
+        removed = set(self.entries) - raw_names
+
+        return {
+            "added": sorted(added),
+            "changed": sorted(changed),
+            "removed": sorted(removed),
+            "unchanged": sorted(unchanged),
+        }
+
+
+class IngestCheckpoint:
+    """
+    Journal of the files an ingest batch has finished, for resuming an interrupted batch.
+
+    parse_many appends one JSON line per parsed file (its index entry, aggregates
+    row and raw file fingerprint) as soon as the file is done, and removes the
+    journal once the combined index and the manifest hold the whole batch. If the
+    run is killed in between, the next batch reads the journal back and skips
+    every file it lists whose raw file is unchanged, so only the remaining work
+    is parsed. A line cut short by the interruption is ignored.
+
+    Args:
+        checkpoint_path (str): Path of the journal (JSON lines)
+    """
+
+    def __init__(self, checkpoint_path):
+        self.checkpoint_path = checkpoint_path
+        self.entries = {}
+
+        if os.path.exists(checkpoint_path):
+            with open(checkpoint_path, "r", encoding="utf-8") as file:
+                for line in file:
+                    try:
+                        record = json.loads(line)
+                    except json.JSONDecodeError:
+                        continue
+                    self.entries[record["file"]] = record
+
+    def __contains__(self, file_name):
+        return file_name in self.entries
+
+    def __len__(self):
+        return len(self.entries)
+
+    def completed(self, raw_path):
+        """
+        Results of the journaled files whose raw file did not change since.
+
+        Only the size and mtime of the raw files are compared, nothing is hashed.
+
+        Args:
+            raw_path (str): Directory of the raw files
+
+        Returns:
+            dict: File name -> result, as returned by the batch task
+        """
+        results = {}
+        for file_name, record in self.entries.items():
+            # Bundle members are journaled as "<bundle>/<member>", their raw file is the bundle
+            raw_file = os.path.join(raw_path, file_name.split("/", 1)[0])
+            try:
+                stat = os.stat(raw_file)
+            except OSError:
+                continue
+
+            source = record["source"]
+            if source["size"] == stat.st_size and source["mtime_ns"] == stat.st_mtime_ns:
+                results[file_name] = tuple(record["result"])
+
+        return results
+
+    def record(self, file_name, result, source):
+        """
+        Append a finished file to the journal, flushed to disk before returning.
+
+        Args:
+            file_name (str): File name as reported by the batch
+            result (tuple): Result of the batch task (JSON serializable)
+            source (dict): Fingerprint of the raw file (or bundle) the result comes from
+        """
+        record = {"file": file_name, "result": list(result), "source": source}
+        self.entries[file_name] = record
+
+        os.makedirs(os.path.dirname(self.checkpoint_path), exist_ok=True)
+        with open(self.checkpoint_path, "a", encoding="utf-8") as file:
+            # Starts on a new line even after a line cut short by an interrupted run
+            file.write("\n" + json.dumps(record) + "\n")
+            file.flush()
+            os.fsync(file.fileno())
+
+    def clear(self):
+        self.entries = {}
+        if os.path.exists(self.checkpoint_path):
+            os.remove(self.checkpoint_path)
@@ -0,0 +1,212 @@
+# Per-stage timers and counters of the ingest and query paths
+import os
+import json
+import time
+import threading
+
+# Registered sinks, every event is passed to each of them; nothing is measured while empty
+_SINKS = []
+_SINKS_LOCK = threading.Lock()
+_JSON_LOGS = {}
+
+
+class Stage:
+    """
+    Timer of one stage, used as a context manager (see stage()).
+
+    Counters added while the stage runs (bytes, rows, ...) are summed and sent
+    with the duration when the stage ends.
+    """
+
+    __slots__ = ("name", "fields", "start")
+    active = True
+
+    def __init__(self, name, fields):
+        self.name = name
+        self.fields = fields
+        self.start = None
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        event = {"type": "stage", "name": self.name, "duration_s": time.perf_counter() - self.start, "ok": exc_type is None}
+        event.update(self.fields)
+        emit(event)
+
+    def add(self, **counters):
+        for name, value in counters.items():
+            self.fields[name] = self.fields.get(name, 0) + value
+
+    def set(self, **fields):
+        self.fields.update(fields)
+
+
+class _NullStage:
+    # Shared stand-in while instrumentation is disabled
+    __slots__ = ()
+    active = False
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        return False
+
+    def add(self, **counters):
+        pass
+
+    def set(self, **fields):
+        pass
+
+
+_NULL_STAGE = _NullStage()
+
+
+def enabled():
+    return bool(_SINKS)
+
+
+def stage(name, **fields):
+    """
+    Time a stage of the ingest or query path.
+
+    Returns a shared no-op object while no sink is registered, so disabled
+    instrumentation costs one function call. Check .active before computing
+    expensive counters (e.g. file sizes).
+
+    Args:
+        name (str): Stage name, e.g. "ingest.save_station"
+        **fields: Values sent with the event (file name, format, ...)
+
+    Returns:
+        Stage: Context manager; add(**counters) sums counters, set(**fields) adds fields
+
+    Example:
+        with stage("station.load", file_name=file_name) as timer:
+            ...
+            if timer.active:
+                timer.add(bytes_read=os.path.getsize(path))
+    """
+    if not _SINKS:
+        return _NULL_STAGE
+
+    return Stage(name, fields)
+
+
+def count(name, value=1, **fields):
+    # Counter event (cache hits, evictions, ...), dropped while disabled
+    if _SINKS:
+        event = {"type": "counter", "name": name, "value": value}
+        event.update(fields)
+        emit(event)
+
+
+def emit(event):
+    event.setdefault("time", time.time())
+    event.setdefault("pid", os.getpid())
+
+    for sink in list(_SINKS):
+        try:
+            sink(event)
+        except Exception:
+            # Monitoring never breaks ingest or queries
+            pass
+
+
+def add_sink(sink):
+    """
+    Register a callable receiving every event as a dict.
+
+    Events have "type" ("stage" or "counter"), "name", "time", "pid", either
+    "duration_s" and "ok" (stages) or "value" (counters), plus the fields and
+    counters of the call site (e.g. "file_name", "bytes_read", "rows").
+
+    Args:
+        sink (callable): Called with each event
+    """
+    with _SINKS_LOCK:
+        if sink not in _SINKS:
+            _SINKS.append(sink)
+
+    return sink
+
+
+def remove_sink(sink):
+    with _SINKS_LOCK:
+        if sink in _SINKS:
+            _SINKS.remove(sink)
+
+
+class JsonLogSink:
+    """
+    Structured log sink writing one JSON object per line.
+
+    The file is opened in append mode and every event is written with one call,
+    so process-pool workers inheriting the sink (fork) can share the log.
+
+    Args:
+        path (str): Path of the log file
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._file = open(path, "a", encoding="utf-8", buffering=1)
+
+    def __call__(self, event):
+        line = json.dumps(event, default=str) + "\n"
+        with self._lock:
+            self._file.write(line)
+
+    def close(self):
+        self._file.close()
+
+
+def enable_json_log(path):
+    # Register a JsonLogSink once per path
+    with _SINKS_LOCK:
+        sink = _JSON_LOGS.get(path)
+        if sink is None:
+            sink = _JSON_LOGS[path] = JsonLogSink(path)
+
+    return add_sink(sink)
+
+
+class MetricsCollector:
+    """
+    In-memory sink aggregating the events of this process.
+
+    Stages are summarized by count, total and maximum duration and the sum of
+    their numeric counters; counter events by their total value.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def __call__(self, event):
+        with self._lock:
+            if event["type"] == "stage":
+                summary = self.stages.setdefault(event["name"], {"count": 0, "total_s": 0.0, "max_s": 0.0})
+                summary["count"] += 1
+                summary["total_s"] += event["duration_s"]
+                summary["max_s"] = max(summary["max_s"], event["duration_s"])
+                for name, value in event.items():
+                    if name not in ("type", "name", "time", "pid", "duration_s", "ok") and isinstance(value, (int, float)) and not isinstance(value, bool):
+                        summary[name] = summary.get(name, 0) + value
+            else:
+                self.counters[event["name"]] = self.counters.get(event["name"], 0) + event["value"]
+
+    def reset(self):
+        with self._lock:
+            self.stages = {}
+            self.counters = {}
+
+    def summary(self):
+        with self._lock:
+            return {
+                "stages": {name: dict(values) for name, values in self.stages.items()},
+                "counters": dict(self.counters),
+            }
@@ -0,0 +1,138 @@
+# Spatial interpolation of the hourly data of nearby stations
+import numpy as np
+
+from .weather_data_columns import WEATHER_FIELD_TYPES
+
+DEFAULT_IDW_POWER = 2
+
+# Standard atmosphere temperature lapse rate (°C per m of elevation)
+STANDARD_LAPSE_RATE = 0.0065
+
+# Blending rule of every field that is not a plain weighted mean
+#   nearest:  value of the nearest station (time stamps, flags and weather codes)
+#   circular: weighted mean of the unit vectors (angles in degrees)
+#   lapse:    weighted mean after moving every station to the site elevation
+FIELD_RULES = {
+    "Year": "nearest",
+    "Month": "nearest",
+    "Day": "nearest",
+    "Hour": "nearest",
+    "Minute": "nearest",
+    "Year_Jalali": "nearest",
+    "Month_Jalali": "nearest",
+    "Day_Jalali": "nearest",
+    "Data_Source_Uncertainty_Flags": "nearest",
+    "Present_Weather_Observation": "nearest",
+    "Present_Weather_Codes": "nearest",
+    "Ceiling_Height": "nearest",  # 77777 encodes an unlimited ceiling, not a height to average
+    "Wind_Direction": "circular",
+    "Dry_Bulb_Temperature": "lapse",
+    "Dew_Point_Temperature": "lapse",
+}
+BLEND_RULES = ("mean", "nearest", "circular", "lapse")
+
+
+def idw_weights(distances, power=DEFAULT_IDW_POWER):
+    """
+    Normalized inverse-distance weights.
+
+    A station at zero distance takes the whole weight.
+
+    Args:
+        distances (array-like): Distances of the stations (km)
+        power (float): IDW power, higher values favour the nearest stations
+
+    Returns:
+        np.ndarray: Weights summing to 1, in the order of distances
+    """
+    distances = np.asarray(distances, dtype="float64")
+
+    if (distances == 0).any():
+        weights = (distances == 0).astype("float64")
+    else:
+        weights = 1 / distances ** power
+
+    return weights / weights.sum()
+
+
+def _weighted_mean(values, weights):
+    # Weighted mean over the stations (axis 0), missing values drop out of the weights
+    present = ~np.isnan(values)
+    column_weights = weights[:, None] * present
+    total = column_weights.sum(axis=0)
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        blended = (np.where(present, values, 0) * column_weights).sum(axis=0) / total
+
+    return np.where(total > 0, blended, np.nan)
+
+
+def blend_columns(stations, distances, power=DEFAULT_IDW_POWER, elevations=None, site_elevation=None,
+                  lapse_rate=STANDARD_LAPSE_RATE, rules=None, fields=None):
+    """
+    Blend the hourly columns of several stations into one series with inverse-distance weights.
+
+    Every field is stacked into a (stations, hours) array and blended with one weighted
+    reduction. Missing values (NaN) are left out and the remaining weights renormalized
+    per hour. See FIELD_RULES for the default rule of every field.
+
+    Args:
+        stations (list[Mapping[str, array-like]]): Hourly columns of every station, e.g.
+            StationData or StationArrays, all with the same number of rows
+        distances (array-like): Distance of every station to the site (km)
+        power (float): IDW power
+        elevations (array-like, optional): Elevation of every station (m)
+        site_elevation (float, optional): Elevation of the site (m); temperatures are only
+            corrected when both elevations are given
+        lapse_rate (float): Temperature decrease per m of elevation (°C/m)
+        rules (dict, optional): Per-field rules overriding FIELD_RULES, one of BLEND_RULES
+        fields (list[str], optional): Fields to blend, those of the nearest station when omitted
+
+    Returns:
+        dict[str, np.ndarray]: Blended columns keyed by field name
+
+    Raises:
+        ValueError: If no station is given, the stations differ in length or a rule is unknown
+    """
+    if not len(stations):
+        raise ValueError("At least one station is needed to blend")
+
+    lengths = {len(station[next(iter(station.keys()))]) for station in stations}
+    if len(lengths) > 1:
+        raise ValueError(f"Stations have different numbers of rows: {sorted(lengths)}")
+
+    distances = np.asarray(distances, dtype="float64")
+    weights = idw_weights(distances, power)
+    nearest = int(np.argmin(distances))
+
+    field_rules = dict(FIELD_RULES, **(rules or {}))
+    fields = list(stations[nearest].keys()) if fields is None else list(fields)
+
+    # Temperature offset of every station at the site elevation
+    offsets = None
+    if elevations is not None and site_elevation is not None:
+        offsets = -lapse_rate * (site_elevation - np.asarray(elevations, dtype="float64"))
+
+    blended = {}
+    for name in fields:
+        rule = field_rules.get(name, "mean" if WEATHER_FIELD_TYPES.get(name) == "float" else "nearest")
+        if rule not in BLEND_RULES:
+            raise ValueError(f"Unknown blending rule '{rule}' for '{name}'. Use one of {BLEND_RULES}.")
+
+        if rule == "nearest":
+            blended[name] = np.asarray(stations[nearest][name])
+            continue
+
+        values = np.stack([np.asarray(station[name], dtype="float64") for station in stations])
+
+        if rule == "circular":
+            angles = np.radians(values)
+            sine = _weighted_mean(np.sin(angles), weights)
+            cosine = _weighted_mean(np.cos(angles), weights)
+            blended[name] = np.degrees(np.arctan2(sine, cosine)) % 360
+        elif rule == "lapse" and offsets is not None:
+            blended[name] = _weighted_mean(values + offsets[:, None], weights)
+        else:
+            blended[name] = _weighted_mean(values, weights)
+
+    return blended
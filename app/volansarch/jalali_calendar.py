@@ -0,0 +1,122 @@
+# Vectorized Gregorian to Jalali date conversion
+import threading
+
+import numpy as np
+import jdatetime
+
+# Days of the Jalali months, Esfand has 30 days in leap years
+JALALI_MONTH_DAYS = (31, 31, 31, 31, 31, 31, 30, 30, 30, 30, 30, 29)
+
+_EPOCH = np.datetime64("1970-01-01", "D")
+
+# Lookup table of every Gregorian day from _TABLE["start"] (days since 1970-01-01), replaced by a larger one on demand
+_TABLE = None
+_TABLE_LOCK = threading.Lock()
+
+
+def _nowruz(jalali_year):
+    # First day (1 Farvardin) of a Jalali year, in days since 1970-01-01
+    gregorian = jdatetime.date(jalali_year, 1, 1).togregorian()
+    return int((np.datetime64(gregorian, "D") - _EPOCH).astype("int64"))
+
+
+def _jalali_year_table(jalali_year):
+    # Jalali year, month, day and day of year of every day of one Jalali year
+    month_days = list(JALALI_MONTH_DAYS)
+    if jdatetime.date(jalali_year, 1, 1).isleap():
+        month_days[-1] += 1
+
+    months = np.repeat(np.arange(1, 13), month_days)
+    days = np.concatenate([np.arange(1, length + 1) for length in month_days])
+    day_of_year = np.arange(1, len(months) + 1)
+
+    return np.full(len(months), jalali_year), months, days, day_of_year
+
+
+def _lookup_table(first_day, last_day):
+    """
+    Day-level Gregorian to Jalali table covering first_day..last_day (days since 1970-01-01).
+
+    The table is built from one jdatetime call per Jalali year (its Nowruz) and the
+    Jalali month lengths, then kept for the process and extended when a later call
+    needs other years, so hours and stations reuse the same table.
+    """
+    global _TABLE
+
+    with _TABLE_LOCK:
+        table = _TABLE
+        if table is not None:
+            if table["start"] <= first_day and last_day < table["start"] + len(table["year"]):
+                return table
+
+            first_day = min(first_day, table["start"])
+            last_day = max(last_day, table["start"] + len(table["year"]) - 1)
+
+        first_year = jdatetime.date.fromgregorian(date=(_EPOCH + np.timedelta64(first_day, "D")).item()).year
+        last_year = jdatetime.date.fromgregorian(date=(_EPOCH + np.timedelta64(last_day, "D")).item()).year
+
+        years = [_jalali_year_table(year) for year in range(first_year, last_year + 1)]
+        table = {"start": _nowruz(first_year)}
+        for name, values in zip(("year", "month", "day", "day_of_year"), zip(*years)):
+            table[name] = np.concatenate(values)
+
+        _TABLE = table
+        return table
+
+
+def _gregorian_days(years, months, days):
+    # Days since 1970-01-01, with the errors datetime() raises for invalid dates
+    if years.size and (years.min() < 1 or years.max() > 9999):
+        raise ValueError("year is out of range")
+    if months.size and (months.min() < 1 or months.max() > 12):
+        raise ValueError("month must be in 1..12")
+
+    first_of_month = (years - 1970).astype("datetime64[Y]") + (months - 1).astype("timedelta64[M]")
+    month_lengths = ((first_of_month + 1).astype("datetime64[D]") - first_of_month.astype("datetime64[D]")).astype("int64")
+    if days.size and ((days < 1) | (days > month_lengths)).any():
+        raise ValueError("day is out of range for month")
+
+    return (first_of_month.astype("datetime64[D]") - _EPOCH).astype("int64") + days - 1
+
+
+def gregorian_to_jalali(years, months, days, hours=None, minutes=None):
+    """
+    Convert whole columns of Gregorian dates to the Jalali calendar at once.
+
+    Gives the same dates as jdatetime.datetime.fromgregorian row by row: the
+    dates are turned into day numbers and looked up in a day-level table (see
+    _lookup_table) instead of converting every row. EPW hours (1-24) and minutes
+    are only checked, as datetime(year, month, day, hour - 1, minute) would.
+
+    Args:
+        years (array-like): Gregorian years
+        months (array-like): Gregorian months (1-12)
+        days (array-like): Gregorian days of the month
+        hours (array-like, optional): EPW hours (1-24)
+        minutes (array-like, optional): Minutes (0-59)
+
+    Returns:
+        dict[str, np.ndarray]: int64 "year", "month", "day" and "day_of_year" (1-366) columns
+
+    Raises:
+        ValueError: For a date, hour or minute datetime() would reject
+    """
+    years, months, days = (np.asarray(values, dtype="int64") for values in (years, months, days))
+
+    if hours is not None:
+        hours = np.asarray(hours, dtype="int64")
+        if hours.size and (hours.min() < 1 or hours.max() > 24):
+            raise ValueError("hour must be in 0..23")
+    if minutes is not None:
+        minutes = np.asarray(minutes, dtype="int64")
+        if minutes.size and (minutes.min() < 0 or minutes.max() > 59):
+            raise ValueError("minute must be in 0..59")
+
+    gregorian_days = _gregorian_days(years, months, days)
+    if not gregorian_days.size:
+        return {name: np.empty(0, dtype="int64") for name in ("year", "month", "day", "day_of_year")}
+
+    table = _lookup_table(int(gregorian_days.min()), int(gregorian_days.max()))
+    positions = gregorian_days - table["start"]
+
+    return {name: table[name][positions] for name in ("year", "month", "day", "day_of_year")}
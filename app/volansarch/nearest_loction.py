@@ -1,88 +1,217 @@
 # Finding N nearest locations
 import pandas as pd
-import numpy as np
 import os
-import json
-from math import radians, sin, cos, sqrt, atan2
-# Loading environment variables
-from dotenv import load_dotenv
+
+from .station_store import load_station, open_station_arrays, select_station_columns
+from .weather_data_columns import weather_columns_to_records
+from .spatial_index import StationSpatialIndex, haversine
+from .weather_aggregates import load_aggregates
+from .station_data import StationData
+from .interpolation import blend_columns, idw_weights, DEFAULT_IDW_POWER, STANDARD_LAPSE_RATE
+from .instrumentation import stage, enable_json_log
+from .settings import get_settings, query_settings
 
 class EPWFileselection:
-    def __init__(self, lat, lon, max_distance=None, loc_numbers=1):
-        load_dotenv()
-        self.settings = {
-            "EPW_PATH": os.getenv("EPW_RAW_PATH"),
-            "EPW_PARSED_PATH": os.getenv("EPW_PARSED_PATH"),
-            "EPW_COMBINED_PATH": os.getenv("EPW_COMBINED_PATH"),
-            "EPW_COMBINED_INDEX_NAME": os.getenv("EPW_COMBINED_INDEX_NAME"),
-        }
+    def __init__(self, lat, lon, max_distance=None, loc_numbers=1, catalog=None, cache=None):
+        # A shared StationCatalog already holds the settings and the preprocessed index
+        self.catalog = catalog
+        # Optional StationCache shared with other instances (e.g. default_station_cache()),
+        # without one every selection loads and owns its data
+        self.cache = cache
+        if catalog is not None:
+            self.settings = catalog.settings
+        else:
+            # Resolved once per process, see settings.get_settings
+            if get_settings()["EPW_METRICS_LOG"]:
+                enable_json_log(get_settings()["EPW_METRICS_LOG"])
+            self.settings = query_settings()
         self.lat = lat
         self.lon = lon
         self.max_distance = max_distance
         self.loc_numbers = loc_numbers
         self.n_nearest_locations = self.find_nearest_location()
-        self.file_name = self.loading_datasets(self.n_nearest_locations, "file_name")
-        self.metadata = self.loading_datasets(self.n_nearest_locations, "metadata")
-        self.data = self.loading_datasets(self.n_nearest_locations, "weather_data")
+
+        # file_name, metadata and data are loaded on first access, stations come from the cache
+        self._datasets = {}
+
+    @property
+    def file_name(self):
+        return self._lazy_datasets("file_name")
+
+    @property
+    def metadata(self):
+        return self._lazy_datasets("metadata")
+
+    @property
+    def data(self):
+        return self._lazy_datasets("weather_data")
+
+    @property
+    def aggregates(self):
+        # Precomputed daily/monthly/annual summaries, no hourly data is loaded
+        if "aggregates" not in self._datasets:
+            self._datasets["aggregates"] = {
+                "aggregates_" + str(i): self.load_station_aggregates(file_name)
+                for i, file_name in enumerate(self.n_nearest_locations["file_name"].tolist())
+            }
+
+        return self._datasets["aggregates"]
+
+    @property
+    def station_data(self):
+        # Compact struct-of-arrays stations (StationData), about 1.1 MB per hourly year
+        if "station_data" not in self._datasets:
+            self._datasets["station_data"] = {
+                "station_data_" + str(i): self.load_station_data(file_name)
+                for i, file_name in enumerate(self.n_nearest_locations["file_name"].tolist())
+            }
+
+        return self._datasets["station_data"]
+
+    def _lazy_datasets(self, field):
+        if field not in self._datasets:
+            self._datasets[field] = self.loading_datasets(self.n_nearest_locations, field)
+
+        return self._datasets[field]
 
     # Haversine distance function
     def haversine(self, lat1, lon1, lat2, lon2):
-        R = 6371  # Radius of Earth in km
-        lat1, lon1, lat2, lon2 = map(radians, [lat1, lon1, lat2, lon2])
-        dlat = lat2 - lat1
-        dlon = lon2 - lon1
-
-        a = sin(dlat/2)**2 + cos(lat1) * cos(lat2) * sin(dlon/2)**2
-        c = 2 * atan2(sqrt(a), sqrt(1-a))
-        return R * c
+        return haversine(lat1, lon1, lat2, lon2)
     
     # Function finding n nearest location
     def find_nearest_location(self):
         settings = self.settings
 
-        index_path = os.path.join(settings["EPW_COMBINED_PATH"], settings["EPW_COMBINED_INDEX_NAME"])
-        df = pd.read_csv(index_path)
+        with stage("query.nearest", catalog=self.catalog is not None) as timer:
+            if self.catalog is not None:
+                nearest = self.catalog.nearest(self.lat, self.lon, self.loc_numbers, self.max_distance)
+            else:
+                index_path = os.path.join(settings["EPW_COMBINED_PATH"], settings["EPW_COMBINED_INDEX_NAME"])
 
-        # Keep only the most recent year_end per location (latitude + longitude)
-        df_latest = df.sort_values("year_end", ascending=False)
-        df_latest = df_latest.drop_duplicates(subset=["latitude", "longitude"], keep="first")
+                # Prebuilt spatial index over the latest station per location, persisted next to the index
+                spatial_index = StationSpatialIndex.load_or_build(index_path)
+                nearest = spatial_index.nearest(self.lat, self.lon, self.loc_numbers, self.max_distance)
+            timer.add(stations=len(nearest))
 
-        # Calculate distance for each remaining station
-        df_latest["distance_km"] = df_latest.apply(
-            lambda row: self.haversine(self.lat, self.lon, row["latitude"], row["longitude"]), axis=1
-        )
+        return nearest
+
+
+    def loading_datasets(self, dataframe, field):
+        file_name_list = dataframe["file_name"].tolist()
+
+        data_dict = {}
+
+        for i, file_name in enumerate(file_name_list):
+            data_dict[field + "_" + str(i)] = self.load_station_field(file_name, field)
+
+        return data_dict
 
-        # Sort by distance
-        df_sorted = df_latest.sort_values(by="distance_km", ascending=True)
-        nearest_distance = df_sorted.iloc[0]["distance_km"]
+    def load_station_field(self, file_name, field):
+        # The index already holds the file name
+        if field == "file_name":
+            return file_name
 
-        # Optionally filter by max_distance
-        if self.max_distance is not None:
-            df_sorted = df_sorted[df_sorted["distance_km"] <= nearest_distance+self.max_distance]
-            n_nearest_locations = df_sorted.head(self.loc_numbers).reset_index(drop=True)
+        parsed_path = self.settings["EPW_PARSED_PATH"]
+
+        if field == "weather_data":
+            station = self._cached(file_name, "weather_data", lambda: load_station(parsed_path, file_name))
         else:
-            n_nearest_locations = df_sorted.head(self.loc_numbers).reset_index(drop=True)
+            # A cached full station already holds the header fields, otherwise they come
+            # from the sidecar without touching the hourly data
+            station = (self.cache.peek(parsed_path, file_name, "weather_data") if self.cache is not None else None) or self._cached(
+                file_name, "header", lambda: load_station(parsed_path, file_name, fields=("file_name", "location", "metadata")),
+            )
 
-        return n_nearest_locations
+        return station[field]
 
+    def load_station_data(self, file_name):
+        parsed_path = self.settings["EPW_PARSED_PATH"]
+        return self._cached(file_name, "station_data", lambda: StationData.load(parsed_path, file_name))
 
-    def loading_datasets(self, dataframe, field):
-        settings = self.settings
+    def load_station_aggregates(self, file_name):
+        parsed_path = self.settings["EPW_PARSED_PATH"]
+        return self._cached(file_name, "aggregates", lambda: load_aggregates(parsed_path, file_name))
 
-        file_name_list = dataframe["file_name"].tolist()
+    def _cached(self, file_name, kind, loader):
+        # Through the shared cache when there is one (its values are shared, read-only), else loaded here
+        if self.cache is None:
+            return loader()
+
+        return self.cache.get(self.settings["EPW_PARSED_PATH"], file_name, kind, loader)
+
+    def select(self, fields=None, start=None, end=None):
+        """
+        Hourly data of the selected stations restricted to some fields and a time window.
+
+        Only the requested columns are read, and for the columnar format only the rows
+        of the months in the window; the json and npz formats load the whole station
+        and filter it afterwards.
+
+        Args:
+            fields (list[str], optional): Hourly fields to return, all fields when omitted
+            start (tuple[int], optional): First (month, day, hour) of the window, inclusive
+            end (tuple[int], optional): Last (month, day, hour) of the window, inclusive
+
+        Returns:
+            dict: "weather_data_<i>" rows (same values as data) for every selected station
+
+        Example:
+            selection.select(["Dry_Bulb_Temperature"], start=(7,), end=(7,))
+        """
+        settings = self.settings
 
         data_dict = {}
 
-        for i, file_name in enumerate(file_name_list):
-            base_name = os.path.splitext(file_name)[0]
-            file_name = base_name + ".json"
-            data_path = os.path.join(settings["EPW_PARSED_PATH"], file_name)
-           
-            # Load the JSON file
-            with open(data_path, "r", encoding="utf-8") as file:
-                data = json.load(file)
-                data_dict[field + "_" + str(i)] = data[field]
+        for i, file_name in enumerate(self.n_nearest_locations["file_name"].tolist()):
+            columns = select_station_columns(settings["EPW_PARSED_PATH"], file_name, fields, start, end)
+            data_dict["weather_data_" + str(i)] = weather_columns_to_records(pd.DataFrame(columns))
 
         return data_dict
 
+    def blend(self, power=DEFAULT_IDW_POWER, site_elevation=None, lapse_rate=STANDARD_LAPSE_RATE, rules=None):
+        """
+        Synthesize the hourly data of the site from the selected stations.
+
+        The stations are blended with inverse-distance weights, see blend_columns.
+
+        Args:
+            power (float): IDW power
+            site_elevation (float, optional): Elevation of the site (m); when given,
+                temperatures are moved to it with the lapse rate
+            lapse_rate (float): Temperature decrease per m of elevation (°C/m)
+            rules (dict, optional): Per-field blending rules overriding FIELD_RULES
+
+        Returns:
+            StationData: Blended series, with the site as location and the source
+            stations, distances and weights as metadata
+        """
+        stations = list(self.station_data.values())
+        distances = self.n_nearest_locations["distance_km"].to_numpy(dtype="float64")
+        elevations = self.n_nearest_locations["elevation_meters"].to_numpy(dtype="float64")
+
+        columns = blend_columns(
+            stations, distances, power=power, elevations=elevations, site_elevation=site_elevation,
+            lapse_rate=lapse_rate, rules=rules,
+        )
+
+        location = {"latitude": self.lat, "longitude": self.lon, "elevation_meters": site_elevation}
+        metadata = {
+            "stations": self.n_nearest_locations["file_name"].tolist(),
+            "distance_km": distances.tolist(),
+            "weights": idw_weights(distances, power).tolist(),
+        }
+
+        return StationData.from_columns(None, location, metadata, columns)
+
+    def loading_arrays(self, dataframe):
+        settings = self.settings
+
+        file_name_list = dataframe["file_name"].tolist()
+
+        arrays_dict = {}
+
+        for i, file_name in enumerate(file_name_list):
+            # Read-only column arrays, memory-mapped for the columnar format
+            arrays_dict["arrays_" + str(i)] = open_station_arrays(settings["EPW_PARSED_PATH"], file_name)
 
+        return arrays_dict
@@ -0,0 +1,195 @@
+# Local HTTP server keeping the catalog and recently used stations in memory
+import io
+import json
+import argparse
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlparse, parse_qs
+
+import numpy as np
+
+from .station_catalog import StationCatalog
+from .station_store import open_station_arrays, select_columns
+from .station_cache import StationCache, DEFAULT_CACHE_BYTES
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+
+
+class IndexUnavailableError(FileNotFoundError):
+    # The combined index is missing, answered with 503 rather than 404
+    pass
+
+
+def parse_window(value):
+    # "7" -> (7,), "7,1,5" -> (7, 1, 5)
+    if value is None:
+        return None
+
+    return tuple(int(part) for part in value.split(","))
+
+
+class QueryHandler(BaseHTTPRequestHandler):
+    """
+    GET endpoints:
+        /nearest?lat=&lon=[&n=1][&max_distance=]
+            Index rows of the nearest stations with "distance_km" (JSON)
+        /metadata?file_name=  or  /metadata?lat=&lon=[&n=1]
+            File name, location and metadata of the stations (JSON)
+        /columns?file_name=  or  /columns?lat=&lon=
+            [&fields=Dry_Bulb_Temperature,Hour][&start=7][&end=7,31,24][&format=npz|json]
+            Hourly columns of one station within a (month, day, hour) window, as an
+            uncompressed .npz (one array per field, read with np.load) or JSON
+        /health
+    """
+
+    server_version = "VolansarchQuery/1.0"
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        params = {name: values[-1] for name, values in parse_qs(url.query).items()}
+
+        routes = {
+            "/nearest": self.nearest,
+            "/metadata": self.metadata,
+            "/columns": self.columns,
+            "/health": self.health,
+        }
+        route = routes.get(url.path)
+        if route is None:
+            return self.send_json({"error": f"Unknown path '{url.path}'"}, 404)
+
+        try:
+            route(params)
+        except IndexUnavailableError as error:
+            self.send_json({"error": str(error)}, 503)
+        except (FileNotFoundError, IndexError) as error:
+            self.send_json({"error": str(error)}, 404)
+        except (KeyError, ValueError, TypeError) as error:
+            self.send_json({"error": f"{type(error).__name__}: {error}"}, 400)
+
+    def log_message(self, format, *args):
+        if not self.server.quiet:
+            super().log_message(format, *args)
+
+    def send_body(self, body, content_type, status=200):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def send_json(self, payload, status=200):
+        self.send_body(json.dumps(payload).encode("utf-8"), "application/json", status)
+
+    def _spatial_index(self):
+        # Spatial index of the catalog, (re)loaded when the combined index changed
+        try:
+            return self.server.catalog.refresh()
+        except FileNotFoundError as error:
+            raise IndexUnavailableError(str(error)) from error
+
+    def _nearest(self, params):
+        return self._spatial_index().nearest(
+            float(params["lat"]), float(params["lon"]), int(params.get("n", 1)),
+            float(params["max_distance"]) if "max_distance" in params else None,
+        )
+
+    def _file_names(self, params):
+        if "file_name" in params:
+            return [params["file_name"]]
+
+        file_names = self._nearest(params)["file_name"].tolist()
+        if not file_names:
+            raise IndexError("No station in the combined index matches the query")
+
+        return file_names
+
+    def nearest(self, params):
+        nearest = self._nearest(params)
+        self.send_json(json.loads(nearest.to_json(orient="records")))
+
+    def metadata(self, params):
+        stations = []
+        for file_name in self._file_names(params):
+            arrays = self.server.station_arrays(file_name)
+            stations.append({"file_name": arrays.file_name, "location": arrays.location, "metadata": arrays.metadata})
+
+        self.send_json(stations)
+
+    def columns(self, params):
+        file_name = self._file_names(dict(params, n=1))[0]
+        arrays = self.server.station_arrays(file_name)
+
+        fields = params["fields"].split(",") if "fields" in params else None
+        columns = select_columns(arrays, fields, parse_window(params.get("start")), parse_window(params.get("end")))
+
+        if params.get("format", "npz") == "json":
+            payload = {name: [None if value != value else value for value in column.tolist()] for name, column in columns.items()}
+            return self.send_json({"file_name": arrays.file_name, "columns": payload})
+
+        buffer = io.BytesIO()
+        np.savez(buffer, **columns)
+        self.send_body(buffer.getvalue(), "application/octet-stream")
+
+    def health(self, params):
+        self.send_json({"status": "ok", "stations": len(self._spatial_index()), "cache": self.server.cache.stats()})
+
+
+class StationQueryServer(ThreadingHTTPServer):
+    """
+    Threaded HTTP server answering station queries from a warm, shared cache.
+
+    The combined index and its spatial index stay loaded in a StationCatalog
+    (reloaded when the index changes) and recently used stations stay open in a
+    StationCache, so short-lived workers skip the cold start of reading the index
+    and the station files. See QueryHandler for the endpoints.
+
+    Args:
+        address (tuple[str, int]): Host and port to listen on
+        catalog (StationCatalog, optional): Shared catalog, built from the environment when omitted
+        cache (StationCache, optional): Cache of the opened stations, a new one with
+            cache_bytes when omitted
+        cache_bytes (int): Byte budget of the new cache
+        quiet (bool): Do not log every request
+    """
+
+    daemon_threads = True
+
+    def __init__(self, address=(DEFAULT_HOST, DEFAULT_PORT), catalog=None, cache=None,
+                 cache_bytes=DEFAULT_CACHE_BYTES, quiet=False):
+        self.catalog = catalog or StationCatalog()
+        self.cache = cache or StationCache(cache_bytes)
+        self.quiet = quiet
+        super().__init__(address, QueryHandler)
+
+    def station_arrays(self, file_name):
+        parsed_path = self.catalog.settings["EPW_PARSED_PATH"]
+        return self.cache.get(parsed_path, file_name, "arrays", lambda: open_station_arrays(parsed_path, file_name))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve nearest-station, metadata and column queries over HTTP.")
+    parser.add_argument("--host", default=DEFAULT_HOST)
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--cache-bytes", type=int, default=DEFAULT_CACHE_BYTES)
+    parser.add_argument("--quiet", action="store_true")
+    args = parser.parse_args(argv)
+
+    server = StationQueryServer((args.host, args.port), cache_bytes=args.cache_bytes, quiet=args.quiet)
+    # Warm the catalog before the first request, queries answer 503 until the index exists
+    try:
+        server.catalog.refresh()
+    except FileNotFoundError as error:
+        print(f"Combined index not available yet: {error}")
+    print(f"Serving on http://{args.host}:{server.server_address[1]}")
+
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+# Configuration shared by the preparator, the selections and the catalog
+import os
+import threading
+
+# Settings read from the .env file and the environment
+SETTING_NAMES = (
+    "EPW_RAW_PATH",
+    "EPW_PARSED_PATH",
+    "EPW_COMBINED_PATH",
+    "EPW_COMBINED_INDEX_NAME",
+    "EPW_PARSED_FORMAT",
+    "EPW_METRICS_LOG",
+)
+
+_SETTINGS = None
+_SETTINGS_LOCK = threading.Lock()
+
+
+def get_settings(reload=False):
+    """
+    Settings of the process, resolved on the first call and shared afterwards.
+
+    Values come from the .env file (searched like load_dotenv does, from this
+    package upwards), environment variables taking precedence. Every preparator,
+    selection and catalog reads the same dict, so updating it (e.g. to point a
+    benchmark at its own workspace) applies to everything created afterwards.
+
+    Args:
+        reload (bool): Read the .env file and the environment again
+
+    Returns:
+        dict: The SETTING_NAMES values, None for the ones that are not set
+    """
+    global _SETTINGS
+
+    with _SETTINGS_LOCK:
+        if _SETTINGS is None or reload:
+            # Only needed once per process
+            from dotenv import dotenv_values
+
+            values = dotenv_values()
+            settings = {name: os.environ.get(name, values.get(name)) for name in SETTING_NAMES}
+
+            if _SETTINGS is None:
+                _SETTINGS = settings
+            else:
+                _SETTINGS.clear()
+                _SETTINGS.update(settings)
+
+        return _SETTINGS
+
+
+def query_settings():
+    # Paths used by EPWFileselection and StationCatalog ("EPW_PATH" is the raw directory)
+    settings = get_settings()
+
+    return {
+        "EPW_PATH": settings["EPW_RAW_PATH"],
+        "EPW_PARSED_PATH": settings["EPW_PARSED_PATH"],
+        "EPW_COMBINED_PATH": settings["EPW_COMBINED_PATH"],
+        "EPW_COMBINED_INDEX_NAME": settings["EPW_COMBINED_INDEX_NAME"],
+    }
@@ -0,0 +1,390 @@
+# Spatial index over the station coordinates of the combined index
+import os
+import importlib.util
+import numpy as np
+import pandas as pd
+from math import radians, sin, cos, sqrt, atan2
+
+from .combined_index import read_combined_index, JOURNAL_SUFFIX
+from .instrumentation import stage
+from .utils import atomic_write
+
+EARTH_RADIUS_KM = 6371  # Radius of Earth in km
+
+SPATIAL_INDEX_SUFFIX = ".spatial.npz"
+
+# Distance-matrix elements per block when batch queries scan without scipy
+BATCH_SCAN_ELEMENTS = 4_000_000
+
+# Single-point queries served by a scan before the KD-tree is built, so one-shot
+# lookups never pay for importing scipy and building the tree
+SCAN_QUERIES_BEFORE_TREE = 8
+
+# scipy's cKDTree once imported, False when scipy is missing
+_CKDTREE = None
+
+
+def kdtree_available():
+    # Without importing scipy
+    return importlib.util.find_spec("scipy") is not None
+
+
+def _kdtree_class():
+    # scipy is optional and slow to import, it is loaded on the first tree build
+    global _CKDTREE
+
+    if _CKDTREE is None:
+        try:
+            from scipy.spatial import cKDTree
+        except ImportError:  # Queries fall back to a vectorized scan
+            cKDTree = False
+        _CKDTREE = cKDTree
+
+    return _CKDTREE or None
+
+
+def haversine(lat1, lon1, lat2, lon2):
+    R = EARTH_RADIUS_KM
+    lat1, lon1, lat2, lon2 = map(radians, [lat1, lon1, lat2, lon2])
+    dlat = lat2 - lat1
+    dlon = lon2 - lon1
+
+    a = sin(dlat/2)**2 + cos(lat1) * cos(lat2) * sin(dlon/2)**2
+    c = 2 * atan2(sqrt(a), sqrt(1-a))
+    return R * c
+
+
+def haversine_array(lat1, lon1, lat2, lon2):
+    # Same formula as haversine, on NumPy arrays (broadcasting)
+    R = EARTH_RADIUS_KM
+    lat1, lon1, lat2, lon2 = (np.radians(np.asarray(value, dtype="float64")) for value in (lat1, lon1, lat2, lon2))
+    dlat = lat2 - lat1
+    dlon = lon2 - lon1
+
+    a = np.sin(dlat/2)**2 + np.cos(lat1) * np.cos(lat2) * np.sin(dlon/2)**2
+    c = 2 * np.arctan2(np.sqrt(a), np.sqrt(1-a))
+    return R * c
+
+
+def unit_vectors(latitudes, longitudes):
+    # Points on the unit sphere, chord length between them grows with the great-circle distance
+    lat = np.radians(np.asarray(latitudes, dtype="float64"))
+    lon = np.radians(np.asarray(longitudes, dtype="float64"))
+    return np.column_stack((np.cos(lat) * np.cos(lon), np.cos(lat) * np.sin(lon), np.sin(lat)))
+
+
+def chord_length(distance_km):
+    # Straight-line distance through the unit sphere for a great-circle distance
+    return 2 * np.sin(np.minimum(np.asarray(distance_km, dtype="float64") / EARTH_RADIUS_KM, np.pi) / 2)
+
+
+def latest_stations(df):
+    # Keep only the most recent year_end per location (latitude + longitude)
+    df_latest = df.sort_values("year_end", ascending=False)
+    df_latest = df_latest.drop_duplicates(subset=["latitude", "longitude"], keep="first")
+
+    return df_latest
+
+
+def index_signature(index_path):
+    # Size and modification time of the index CSV and its journal
+    signature = []
+    for path in (index_path, index_path + JOURNAL_SUFFIX):
+        if os.path.exists(path):
+            stat = os.stat(path)
+            signature.extend([stat.st_size, stat.st_mtime_ns])
+        else:
+            signature.extend([-1, -1])
+
+    return np.array(signature, dtype="int64")
+
+
+def _station_arrays(stations, vectors):
+    # Station table as plain arrays for np.savez (no pickled objects), text columns with a null mask
+    arrays = {"vectors": vectors, "columns": np.array(stations.columns.tolist(), dtype=str)}
+
+    for position, column in enumerate(stations.columns):
+        values = stations[column]
+        if values.dtype.kind in "biuf":
+            arrays[f"column_{position}"] = values.to_numpy()
+        else:
+            nulls = values.isna().to_numpy()
+            arrays[f"column_{position}"] = np.where(nulls, "", values.astype(str).to_numpy()).astype(str)
+            arrays[f"nulls_{position}"] = nulls
+
+    return arrays
+
+
+def _load_stations(persisted):
+    # Inverse of _station_arrays
+    columns = {}
+
+    for position, column in enumerate(persisted["columns"].tolist()):
+        values = persisted[f"column_{position}"]
+        if f"nulls_{position}" in persisted.files:
+            values = values.astype(object)
+            values[persisted[f"nulls_{position}"]] = np.nan
+        columns[column] = values
+
+    return pd.DataFrame(columns), persisted["vectors"]
+
+
+class StationSpatialIndex:
+    """
+    k-nearest and radius queries over the stations of the combined index.
+
+    Stations are stored as 3D unit vectors, where the chord length orders points
+    exactly like the great-circle distance, in a KD-tree (scipy's cKDTree when
+    available, otherwise a vectorized scan). The tree only selects candidates;
+    their distances are computed with the same haversine as before, so results
+    match the full-table scan. The tree is built on first use: by batch queries,
+    or once SCAN_QUERIES_BEFORE_TREE single-point queries have been scanned.
+
+    Args:
+        stations (pd.DataFrame): Latest station per location, see latest_stations
+        vectors (np.ndarray, optional): Unit vectors of the stations, computed when omitted
+    """
+
+    def __init__(self, stations, vectors=None):
+        self.stations = stations.reset_index(drop=True)
+        if vectors is None:
+            vectors = unit_vectors(self.stations["latitude"], self.stations["longitude"])
+        self.vectors = vectors
+        self._tree = None
+        self._scanned_queries = 0
+
+    @property
+    def tree(self):
+        # KD-tree over the vectors, None without scipy or stations
+        if self._tree is None:
+            cKDTree = _kdtree_class() if len(self.vectors) else None
+            self._tree = cKDTree(self.vectors) if cKDTree is not None else False
+
+        return self._tree or None
+
+    def _query_tree(self):
+        # Tree for a single-point query, None while it is cheaper to scan
+        if self._tree is None and self._scanned_queries < SCAN_QUERIES_BEFORE_TREE:
+            self._scanned_queries += 1
+            return None
+
+        return self.tree
+
+    @classmethod
+    def load_or_build(cls, index_path):
+        """
+        Get the spatial index of a combined index, reusing the persisted one when still valid.
+
+        The latest-station table (every index column) and its unit vectors are persisted
+        to "<index>.spatial.npz" together with the size and mtime of the index (and its
+        journal). While those match, queries are answered from that file alone: the CSV
+        is not read and the dedup is not redone. It is rebuilt when either changes.
+
+        Args:
+            index_path (str): Path of the combined index CSV
+
+        Returns:
+            StationSpatialIndex: Index over the latest station per location
+        """
+        with stage("spatial_index.load") as timer:
+            spatial_path = index_path + SPATIAL_INDEX_SUFFIX
+            signature = index_signature(index_path)
+
+            # A missing index is reported by read_combined_index
+            if (signature != -1).any() and os.path.exists(spatial_path):
+                try:
+                    with np.load(spatial_path) as persisted:
+                        if np.array_equal(persisted["signature"], signature):
+                            stations, vectors = _load_stations(persisted)
+                            timer.set(rebuilt=False)
+                            return cls(stations, vectors)
+                except (OSError, ValueError, KeyError):
+                    pass
+
+            df_latest = latest_stations(read_combined_index(index_path).reset_index(drop=True))
+            spatial_index = cls(df_latest)
+
+            try:
+                with atomic_write(spatial_path, "wb") as file:
+                    np.savez(file, signature=signature, **_station_arrays(spatial_index.stations, spatial_index.vectors))
+            except OSError:
+                pass
+
+            timer.set(rebuilt=True)
+            return spatial_index
+
+    def __len__(self):
+        return len(self.stations)
+
+    def _chord_distances(self, vector, positions=None):
+        vectors = self.vectors if positions is None else self.vectors[positions]
+        return np.sqrt(((vectors - vector) ** 2).sum(axis=1))
+
+    def _k_nearest_positions(self, vector, k, tree):
+        # Positions of the k nearest stations, plus any station tied with the k-th one
+        n = len(self)
+        if k >= n:
+            return np.arange(n)
+
+        if tree is not None:
+            distances, _ = tree.query(vector, k=k)
+            kth_distance = np.atleast_1d(distances)[-1]
+        else:
+            kth_distance = np.partition(self._chord_distances(vector), k - 1)[k - 1]
+
+        return self._radius_positions(vector, kth_distance, tree)
+
+    def _radius_positions(self, vector, chord, tree):
+        # Slightly widened so rounding never drops a station on the boundary
+        chord = chord * (1 + 1e-9) + 1e-12
+
+        if tree is not None:
+            return np.array(sorted(tree.query_ball_point(vector, chord)), dtype="int64")
+
+        return np.flatnonzero(self._chord_distances(vector) <= chord)
+
+    def _with_distances(self, lat, lon, positions):
+        # Exact distances for the candidates, sorted by distance then by index order
+        with stage("spatial_index.distances", candidates=len(positions)):
+            return self._sorted_candidates(lat, lon, positions)
+
+    def _sorted_candidates(self, lat, lon, positions):
+        distances = [
+            haversine(lat, lon, latitude, longitude)
+            for latitude, longitude in zip(
+                self.stations["latitude"].to_numpy()[positions].tolist(),
+                self.stations["longitude"].to_numpy()[positions].tolist(),
+            )
+        ]
+        order = np.lexsort((positions, distances))
+
+        candidates = self.stations.iloc[positions[order]].copy()
+        candidates["distance_km"] = np.asarray(distances, dtype="float64")[order]
+
+        return candidates
+
+    def nearest(self, lat, lon, loc_numbers=1, max_distance=None):
+        """
+        Find the nearest stations to a point.
+
+        Args:
+            lat (float): Latitude of the point
+            lon (float): Longitude of the point
+            loc_numbers (int): Number of stations to return
+            max_distance (float, optional): Only keep stations at most this many km
+                further than the nearest one
+
+        Returns:
+            pd.DataFrame: Index rows of the selected stations with a "distance_km" column,
+            sorted by distance
+        """
+        vector = unit_vectors([lat], [lon])[0]
+        positions = self._k_nearest_positions(vector, loc_numbers, self._query_tree())
+
+        df_sorted = self._with_distances(lat, lon, positions)
+
+        # Optionally filter by max_distance
+        if max_distance is not None and len(df_sorted):
+            nearest_distance = df_sorted.iloc[0]["distance_km"]
+            df_sorted = df_sorted[df_sorted["distance_km"] <= nearest_distance + max_distance]
+
+        return df_sorted.head(loc_numbers).reset_index(drop=True)
+
+    def within(self, lat, lon, radius_km):
+        """
+        Find every station within a great-circle radius of a point.
+
+        Args:
+            lat (float): Latitude of the point
+            lon (float): Longitude of the point
+            radius_km (float): Search radius (km)
+
+        Returns:
+            pd.DataFrame: Index rows with a "distance_km" column, sorted by distance
+        """
+        vector = unit_vectors([lat], [lon])[0]
+        positions = self._radius_positions(vector, chord_length(radius_km), self._query_tree())
+
+        df_sorted = self._with_distances(lat, lon, positions)
+        df_sorted = df_sorted[df_sorted["distance_km"] <= radius_km]
+
+        return df_sorted.reset_index(drop=True)
+
+    def _k_nearest_many(self, vectors, k):
+        # Positions of the k nearest stations for every query point, one row per point
+        tree = self.tree
+        if tree is not None:
+            _, positions = tree.query(vectors, k=k)
+            return np.asarray(positions).reshape(len(vectors), k)
+
+        # Without scipy, scan in blocks of points to bound the size of the distance matrix
+        block = max(1, BATCH_SCAN_ELEMENTS // max(len(self), 1))
+        positions = np.empty((len(vectors), k), dtype="int64")
+        for start in range(0, len(vectors), block):
+            chunk = vectors[start:start + block]
+            distances = np.sqrt(((chunk[:, None, :] - self.vectors[None, :, :]) ** 2).sum(axis=2))
+            if k < len(self):
+                nearest_k = np.argpartition(distances, k - 1, axis=1)[:, :k]
+            else:
+                nearest_k = np.broadcast_to(np.arange(len(self)), (len(chunk), len(self)))
+            positions[start:start + block] = nearest_k
+
+        return positions
+
+    def nearest_many(self, lats, lons, loc_numbers=1, max_distance=None):
+        """
+        Find the nearest stations for many points in one vectorized pass.
+
+        Args:
+            lats (array-like): Latitudes of the points
+            lons (array-like): Longitudes of the points
+            loc_numbers (int | array-like): Number of stations per point, scalar or one per point
+            max_distance (float | array-like, optional): Only keep stations at most this many km
+                further than the nearest one, scalar or one per point (NaN for no limit)
+
+        Returns:
+            pd.DataFrame: One row per (point, station) with "site" (position of the point),
+            "rank" (0 = nearest), "station" (row in self.stations), "file_name" and
+            "distance_km", sorted by site then rank. Distances use the vectorized haversine
+            and may differ from nearest() in the last bit.
+        """
+        lats = np.atleast_1d(np.asarray(lats, dtype="float64"))
+        lons = np.atleast_1d(np.asarray(lons, dtype="float64"))
+        sites = len(lats)
+
+        loc_numbers = np.broadcast_to(np.asarray(loc_numbers, dtype="int64"), (sites,))
+        if max_distance is None:
+            max_distance = np.full(sites, np.nan)
+        max_distance = np.broadcast_to(np.asarray(max_distance, dtype="float64"), (sites,))
+
+        k = int(min(loc_numbers.max(initial=0), len(self)))
+        if sites == 0 or k == 0:
+            return pd.DataFrame({"site": [], "rank": [], "station": [], "file_name": [], "distance_km": []})
+
+        positions = self._k_nearest_many(unit_vectors(lats, lons), k)
+
+        # Exact great-circle distances of the candidates, sorted per point
+        station_lats = self.stations["latitude"].to_numpy(dtype="float64")
+        station_lons = self.stations["longitude"].to_numpy(dtype="float64")
+        distances = haversine_array(lats[:, None], lons[:, None], station_lats[positions], station_lons[positions])
+
+        order = np.argsort(distances, axis=1, kind="stable")
+        positions = np.take_along_axis(positions, order, axis=1)
+        distances = np.take_along_axis(distances, order, axis=1)
+
+        # Per-point number of stations and distance window
+        ranks = np.broadcast_to(np.arange(k), (sites, k))
+        keep = ranks < loc_numbers[:, None]
+        limit = distances[:, :1] + max_distance[:, None]
+        keep &= np.isnan(limit) | (distances <= limit)
+
+        site_index, rank_index = np.nonzero(keep)
+        station_index = positions[site_index, rank_index]
+
+        return pd.DataFrame({
+            "site": site_index,
+            "rank": rank_index,
+            "station": station_index,
+            "file_name": self.stations["file_name"].to_numpy()[station_index],
+            "distance_km": distances[site_index, rank_index],
+        })
@@ -0,0 +1,171 @@
+# Process-wide cache of loaded station data with a byte budget
+import os
+import sys
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+from .station_store import find_station_file, StationArrays
+from .station_data import StationData
+from .instrumentation import count
+
+# Default budget of the shared cache (bytes)
+DEFAULT_CACHE_BYTES = 256 * 1024 * 1024
+
+_DEFAULT_CACHE = None
+_DEFAULT_CACHE_LOCK = threading.Lock()
+
+
+def estimate_nbytes(value):
+    """
+    Approximate memory held by a loaded station value.
+
+    Lists of row dicts are sized from their first row, NumPy arrays by their
+    buffers. Memory-mapped columns are not counted since they live in the OS
+    page cache, not in the process heap.
+
+    Args:
+        value: Value returned by a station loader
+
+    Returns:
+        int: Estimated size in bytes
+    """
+    if isinstance(value, (StationData, StationArrays)):
+        return value.nbytes
+
+    if isinstance(value, np.ndarray):
+        return 0 if isinstance(value, np.memmap) else value.nbytes
+
+    if isinstance(value, pd.DataFrame):
+        return int(value.memory_usage(deep=True).sum())
+
+    if isinstance(value, dict):
+        return sys.getsizeof(value) + sum(estimate_nbytes(item) for item in value.values())
+
+    if isinstance(value, (list, tuple)):
+        if not value:
+            return sys.getsizeof(value)
+        # Rows share one layout, the first one stands for all
+        return sys.getsizeof(value) + len(value) * estimate_nbytes(value[0])
+
+    return sys.getsizeof(value)
+
+
+class StationCache:
+    """
+    Least recently used cache of loaded station data, bounded by a byte budget.
+
+    Entries are keyed by what was loaded (e.g. "weather_data", "station_data"),
+    the parsed file and its mtime, so a station rewritten by a new ingest is
+    loaded again. When the estimated size of the entries exceeds max_bytes the
+    least recently used ones are evicted; an entry larger than the whole budget
+    is returned without being cached. Cached values are shared between callers
+    and must be treated as read-only.
+
+    Args:
+        max_bytes (int): Byte budget of the cache
+
+    Attributes:
+        hits (int): Lookups served from the cache
+        misses (int): Lookups that had to load
+        evictions (int): Entries dropped to stay within the budget
+    """
+
+    def __init__(self, max_bytes=DEFAULT_CACHE_BYTES):
+        self.max_bytes = max_bytes
+        self.current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def key(self, parsed_path, file_name, kind):
+        path, _ = find_station_file(parsed_path, file_name)
+        return kind, path, os.stat(path).st_mtime_ns
+
+    def get(self, parsed_path, file_name, kind, loader):
+        """
+        Cached value of a station, loaded with loader() on a miss.
+
+        Args:
+            parsed_path (str): Directory of the parsed store
+            file_name (str): Station file name as stored in the combined index
+            kind (str): Name of what loader returns, part of the key
+            loader (callable): Loads the value when it is not cached
+
+        Returns:
+            The cached or freshly loaded value
+        """
+        key = self.key(parsed_path, file_name, kind)
+
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                count("cache.hit", kind=kind)
+                return self._entries[key][0]
+            self.misses += 1
+        count("cache.miss", kind=kind)
+
+        value = loader()
+        self.put(key, value)
+
+        return value
+
+    def peek(self, parsed_path, file_name, kind):
+        # Cached value or None, without loading or touching the counters
+        key = self.key(parsed_path, file_name, kind)
+
+        with self._lock:
+            entry = self._entries.get(key)
+            return None if entry is None else entry[0]
+
+    def put(self, key, value):
+        nbytes = estimate_nbytes(value)
+        if nbytes > self.max_bytes:
+            return
+
+        with self._lock:
+            if key in self._entries:
+                self.current_bytes -= self._entries.pop(key)[1]
+
+            self._entries[key] = (value, nbytes)
+            self.current_bytes += nbytes
+
+            while self.current_bytes > self.max_bytes:
+                evicted_key, (_, evicted_bytes) = self._entries.popitem(last=False)
+                self.current_bytes -= evicted_bytes
+                self.evictions += 1
+                count("cache.eviction", kind=evicted_key[0], bytes=evicted_bytes)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.current_bytes = 0
+
+    def stats(self):
+        return {
+            "entries": len(self._entries),
+            "bytes": self.current_bytes,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
+
+
+def default_station_cache():
+    # Process-wide cache for the selections that opt in with cache=default_station_cache(), created on first use
+    global _DEFAULT_CACHE
+
+    with _DEFAULT_CACHE_LOCK:
+        if _DEFAULT_CACHE is None:
+            _DEFAULT_CACHE = StationCache()
+
+    return _DEFAULT_CACHE
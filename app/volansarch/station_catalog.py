@@ -0,0 +1,55 @@
+# Long-lived, shared view of the combined index
+import os
+import threading
+
+from .spatial_index import StationSpatialIndex, index_signature
+from .settings import query_settings
+
+
+class StationCatalog:
+    """
+    Combined index loaded and preprocessed once, shared by many queries.
+
+    The latest-station-per-location table and its spatial index are kept in memory.
+    Every access checks the size and mtime of the index CSV and its journal, and
+    reloads when either changed, so long-running services pick up new ingests.
+    Pass the catalog to EPWFileselection to skip the per-query index setup.
+
+    Args:
+        settings (dict, optional): EPW_* paths; the shared settings (.env) when omitted
+    """
+
+    def __init__(self, settings=None):
+        if settings is None:
+            settings = query_settings()
+        self.settings = settings
+        self.index_path = os.path.join(settings["EPW_COMBINED_PATH"], settings["EPW_COMBINED_INDEX_NAME"])
+
+        self._lock = threading.Lock()
+        self._signature = None
+        self._spatial_index = None
+
+    def refresh(self, force=False):
+        # Reload the index when the files changed since the last load
+        signature = index_signature(self.index_path)
+
+        with self._lock:
+            if force or self._spatial_index is None or not (signature == self._signature).all():
+                self._spatial_index = StationSpatialIndex.load_or_build(self.index_path)
+                self._signature = signature
+
+            return self._spatial_index
+
+    @property
+    def spatial_index(self):
+        return self.refresh()
+
+    @property
+    def stations(self):
+        return self.refresh().stations
+
+    def nearest(self, lat, lon, loc_numbers=1, max_distance=None):
+        return self.refresh().nearest(lat, lon, loc_numbers, max_distance)
+
+    def nearest_many(self, lats, lons, loc_numbers=1, max_distance=None):
+        return self.refresh().nearest_many(lats, lons, loc_numbers, max_distance)
@@ -0,0 +1,465 @@
+# Reading and writing parsed station files
+import os
+import json
+import threading
+import numpy as np
+import pandas as pd
+
+from .utils import station_base_name, atomic_write
+from .weather_data_columns import WEATHER_FIELD_TYPES, weather_columns_to_records
+from .instrumentation import stage
+
+# Supported formats of the parsed store and their file extensions
+#   json:     one pretty-printed document holding file name, location, metadata and the hourly rows
+#   npz:      one compressed array per hourly field
+#   columnar: uncompressed fixed-layout columns that can be memory-mapped, layout kept in the sidecar
+# Every format also writes a small .meta.json sidecar with file name, location and metadata,
+# so header fields can be read without touching the hourly data
+PARSED_FORMATS = {"json": ".json", "npz": ".npz", "columnar": ".col"}
+DEFAULT_PARSED_FORMAT = "json"
+
+SIDECAR_SUFFIX = ".meta.json"
+
+# Byte alignment of every column in the columnar format
+COLUMN_ALIGNMENT = 64
+
+
+def save_station(data, weather_columns, parsed_path, base_name, output_format=DEFAULT_PARSED_FORMAT):
+    """
+    Write a parsed station to the parsed store.
+
+    The station file and its sidecar are each written to a temporary file and moved
+    in place, so an interrupted write never leaves a truncated station behind.
+
+    Args:
+        data (dict): Parsed station with "file_name", "location", "metadata" and "weather_data"
+        weather_columns (pd.DataFrame): Typed hourly columns the weather data was built from
+        parsed_path (str): Directory of the parsed store
+        base_name (str): Station file name without extension
+        output_format (str): One of PARSED_FORMATS
+
+    Returns:
+        str: Path of the written station file
+    """
+    if output_format not in PARSED_FORMATS:
+        raise ValueError(f"Unsupported parsed format '{output_format}'. Use one of {tuple(PARSED_FORMATS)}.")
+
+    os.makedirs(parsed_path, exist_ok=True)
+    save_path = os.path.join(parsed_path, base_name + PARSED_FORMATS[output_format])
+
+    sidecar = {
+        "file_name": data["file_name"],
+        "location": data["location"],
+        "metadata": data["metadata"],
+        "format": output_format,
+        "fields": list(weather_columns.columns),
+        "rows": len(weather_columns),
+        "row_groups": month_row_groups(weather_columns["Month"].to_numpy()) if "Month" in weather_columns else [],
+    }
+
+    if output_format == "json":
+        with atomic_write(save_path, "w") as file:
+            json.dump(data, file, indent=4)
+
+    elif output_format == "npz":
+        arrays = {}
+        for name in weather_columns.columns:
+            if WEATHER_FIELD_TYPES.get(name) == "str":
+                arrays[name] = weather_columns[name].to_numpy(dtype=str)
+            else:
+                arrays[name] = weather_columns[name].to_numpy()
+        with atomic_write(save_path, "wb") as file:
+            np.savez_compressed(file, **arrays)
+
+    elif output_format == "columnar":
+        # Columns are written back to back, each starting on an aligned offset
+        layout = []
+        offset = 0
+        with atomic_write(save_path, "wb") as file:
+            for name in weather_columns.columns:
+                if WEATHER_FIELD_TYPES.get(name) == "str":
+                    array = np.char.encode(weather_columns[name].to_numpy(dtype=str), "utf-8")
+                else:
+                    array = np.ascontiguousarray(weather_columns[name].to_numpy())
+
+                padding = -offset % COLUMN_ALIGNMENT
+                file.write(b"\0" * padding)
+                offset += padding
+
+                file.write(array.tobytes())
+                layout.append({"name": name, "dtype": array.dtype.str, "offset": offset, "length": len(array)})
+                offset += array.nbytes
+
+        sidecar["layout"] = layout
+
+    with atomic_write(os.path.join(parsed_path, base_name + SIDECAR_SUFFIX), "w") as file:
+        json.dump(sidecar, file, indent=4)
+
+    return save_path
+
+
+def delete_station(parsed_path, file_name):
+    """
+    Remove every parsed file of a station (all formats and the sidecar) from the parsed store.
+
+    Args:
+        parsed_path (str): Directory of the parsed store
+        file_name (str): Station file name as stored in the combined index
+
+    Returns:
+        list[str]: Paths of the removed files
+    """
+    base_name = station_base_name(file_name)
+
+    removed = []
+    for extension in list(PARSED_FORMATS.values()) + [SIDECAR_SUFFIX]:
+        path = os.path.join(parsed_path, base_name + extension)
+        if os.path.isfile(path):
+            os.remove(path)
+            removed.append(path)
+
+    return removed
+
+
+def month_row_groups(months):
+    """
+    Row ranges of the consecutive runs of the same month, used to skip rows on read.
+
+    Args:
+        months (np.ndarray): Month of every hourly row
+
+    Returns:
+        list[dict]: "month", "start" and "end" (exclusive) of every run, in row order
+    """
+    months = np.asarray(months, dtype="int64")
+    if not len(months):
+        return []
+
+    starts = np.flatnonzero(np.diff(months)) + 1
+    starts = np.concatenate(([0], starts))
+    ends = np.concatenate((starts[1:], [len(months)]))
+
+    return [
+        {"month": int(months[start]), "start": int(start), "end": int(end)}
+        for start, end in zip(starts.tolist(), ends.tolist())
+    ]
+
+
+def _window_key(month, day, hour):
+    # Sortable month/day/hour key, e.g. (7, 1, 1) -> 70101
+    return month * 10000 + day * 100 + hour
+
+
+def _window_bounds(start, end):
+    # Fill open ends of a window with the first / last hour of the year, an empty tuple is an open end
+    start = tuple(start) + (1, 1)[len(start) - 1:] if start else (1, 1, 0)
+    end = tuple(end) + (31, 24)[len(end) - 1:] if end else (12, 31, 24)
+
+    return start[:3], end[:3]
+
+
+def find_station_file(parsed_path, file_name):
+    """
+    Locate the parsed file of a station, whatever format it was written in.
+
+    When a station exists in several formats the most recently written one wins.
+
+    Args:
+        parsed_path (str): Directory of the parsed store
+        file_name (str): Station file name as stored in the combined index
+
+    Returns:
+        tuple[str, str]: Path of the parsed file and its format
+
+    Raises:
+        FileNotFoundError: If the station has not been parsed
+    """
+    base_name = station_base_name(file_name)
+
+    candidates = []
+    for output_format, extension in PARSED_FORMATS.items():
+        path = os.path.join(parsed_path, base_name + extension)
+        if os.path.isfile(path):
+            candidates.append((os.path.getmtime(path), path, output_format))
+
+    if not candidates:
+        raise FileNotFoundError(f"No parsed file for '{base_name}' in '{parsed_path}'")
+
+    _, path, output_format = max(candidates)
+
+    return path, output_format
+
+
+def load_station(parsed_path, file_name, fields=("file_name", "location", "metadata", "weather_data")):
+    """
+    Load the requested top-level fields of a parsed station.
+
+    Args:
+        parsed_path (str): Directory of the parsed store
+        file_name (str): Station file name as stored in the combined index
+        fields (tuple[str]): Any of "file_name", "location", "metadata" and "weather_data"
+
+    Returns:
+        dict: The requested fields, with the same values whichever format the station is stored in
+    """
+    path, output_format = find_station_file(parsed_path, file_name)
+
+    # Header-only requests are served from the sidecar
+    sidecar_path = os.path.splitext(path)[0] + SIDECAR_SUFFIX
+    if "weather_data" not in fields and os.path.isfile(sidecar_path):
+        with stage("station.load_header", file_name=file_name) as timer:
+            with open(sidecar_path, "r", encoding="utf-8") as file:
+                sidecar = json.load(file)
+            if timer.active:
+                timer.add(bytes_read=os.path.getsize(sidecar_path))
+        return {field: sidecar[field] for field in fields}
+
+    if output_format == "json":
+        with stage("station.load", file_name=file_name, format=output_format) as timer:
+            with open(path, "r", encoding="utf-8") as file:
+                data = json.load(file)
+            if timer.active:
+                timer.add(bytes_read=os.path.getsize(path), rows=len(data["weather_data"]))
+        return {field: data[field] for field in fields}
+
+    arrays = open_station_arrays(parsed_path, file_name)
+
+    station = {}
+    for field in fields:
+        if field == "weather_data":
+            with stage("station.load", file_name=file_name, format=output_format, rows=len(arrays)):
+                weather_columns = pd.DataFrame({name: arrays[name] for name in arrays.keys()})
+                station[field] = weather_columns_to_records(weather_columns)
+        else:
+            station[field] = getattr(arrays, field)
+
+    return station
+
+
+class StationArrays:
+    """
+    Hourly columns of one parsed station exposed as read-only NumPy arrays.
+
+    For the columnar format every numeric column is a zero-copy view into a
+    memory-mapped file, so opening a station parses nothing and processes
+    reading the same station share the OS page cache. String columns are
+    decoded on first access.
+
+    Attributes:
+        file_name (str): Station file name as stored in the combined index
+        location (dict): Location header of the station
+        metadata (dict): Metadata of the station
+        format (str): Format the station was read from
+        row_groups (list[dict]): Row range of every month run, see month_row_groups
+    """
+
+    def __init__(self, file_name, location, metadata, output_format, columns, row_groups=None):
+        self.file_name = file_name
+        self.location = location
+        self.metadata = metadata
+        self.format = output_format
+        self.row_groups = row_groups or []
+        self._columns = columns
+        self._decoded = {}
+        self._lock = threading.Lock()
+
+    def __getitem__(self, name):
+        if name in self._decoded:
+            return self._decoded[name]
+
+        # npz members share one file handle, reads are serialized so threads can share a station
+        with self._lock:
+            if name not in self._decoded:
+                array = self._columns[name]
+                if array.dtype.kind == "S":
+                    array = np.char.decode(array, "utf-8")
+                if array.flags.writeable:
+                    array.flags.writeable = False
+
+                self._decoded[name] = array
+
+        return self._decoded[name]
+
+    def take(self, name, ranges):
+        """
+        Read-only rows of a column from a list of (start, end) row ranges.
+
+        Rows are sliced before decoding, so only the selected rows of a
+        memory-mapped column are read.
+        """
+        if name in self._decoded or self.format != "columnar" or self._columns[name].dtype.kind != "S":
+            array = self[name]
+        else:
+            array = self._columns[name]
+
+        parts = [array[start:end] for start, end in ranges]
+        rows = np.concatenate(parts) if parts else array[:0]
+        if rows.dtype.kind == "S":
+            rows = np.char.decode(rows, "utf-8")
+
+        return rows
+
+    @property
+    def nbytes(self):
+        # Estimated heap bytes once every column is read; memory-mapped columns live in the page cache
+        if self.format == "columnar":
+            return sum(len(array) * 4 * array.dtype.itemsize for array in self._columns.values() if array.dtype.kind == "S")
+
+        return len(self) * 8 * len(self.keys()) if self.keys() else 0
+
+    def __contains__(self, name):
+        return name in self._columns
+
+    def __len__(self):
+        return len(self._columns[next(iter(self._columns))])
+
+    def keys(self):
+        return list(self._columns)
+
+
+def open_station_arrays(parsed_path, file_name):
+    """
+    Open a parsed station as read-only column arrays.
+
+    Args:
+        parsed_path (str): Directory of the parsed store
+        file_name (str): Station file name as stored in the combined index
+
+    Returns:
+        StationArrays: Hourly columns keyed by field name
+    """
+    path, output_format = find_station_file(parsed_path, file_name)
+
+    with stage("station.open", file_name=file_name, format=output_format) as timer:
+        arrays = _open_station_arrays(path, output_format)
+        if timer.active:
+            # Bytes of the file; npz and columnar columns are only read when accessed
+            timer.add(bytes_read=os.path.getsize(path) if output_format == "json" else 0, rows=len(arrays))
+
+    return arrays
+
+
+def _open_station_arrays(path, output_format):
+    if output_format == "json":
+        with open(path, "r", encoding="utf-8") as file:
+            data = json.load(file)
+
+        weather_data = data["weather_data"]
+        columns = {}
+        for name in (weather_data[0].keys() if weather_data else []):
+            values = [row[name] for row in weather_data]
+            if WEATHER_FIELD_TYPES.get(name) == "float":
+                columns[name] = np.array([np.nan if value is None else value for value in values], dtype="float64")
+            elif WEATHER_FIELD_TYPES.get(name) == "str":
+                columns[name] = np.array(values, dtype=str)
+            else:
+                columns[name] = np.array(values, dtype="int64")
+
+        row_groups = month_row_groups(columns["Month"]) if "Month" in columns else []
+
+        return StationArrays(data["file_name"], data["location"], data["metadata"], output_format, columns, row_groups)
+
+    base_name = os.path.splitext(path)[0]
+    with open(base_name + SIDECAR_SUFFIX, "r", encoding="utf-8") as file:
+        sidecar = json.load(file)
+
+    if output_format == "npz":
+        # NpzFile only decompresses a member when it is accessed
+        columns = np.load(path)
+
+    else:
+        # One mapping for the whole file, one view per column
+        buffer = np.memmap(path, dtype=np.uint8, mode="r")
+        columns = {}
+        for column in sidecar["layout"]:
+            dtype = np.dtype(column["dtype"])
+            start = column["offset"]
+            end = start + dtype.itemsize * column["length"]
+            columns[column["name"]] = buffer[start:end].view(dtype)
+
+    return StationArrays(
+        sidecar["file_name"], sidecar["location"], sidecar["metadata"], output_format, columns,
+        sidecar.get("row_groups"),
+    )
+
+
+def select_station_columns(parsed_path, file_name, fields=None, start=None, end=None):
+    """
+    Read a subset of the hourly columns of a station, restricted to a month/day/hour window.
+
+    Only the requested columns are read. For the columnar format the rows outside the
+    months of the window are not read either: the month row groups of the sidecar give
+    the row ranges to slice from the memory-mapped columns before the exact day/hour filter.
+
+    Args:
+        parsed_path (str): Directory of the parsed store
+        file_name (str): Station file name as stored in the combined index
+        fields (list[str], optional): Hourly fields to return, all fields when omitted
+        start (tuple[int], optional): First (month, day, hour) of the window, inclusive;
+            (month,) or (month, day) start at the first day / hour
+        end (tuple[int], optional): Last (month, day, hour) of the window, inclusive;
+            (month,) or (month, day) end at the last day / hour. A window whose end
+            is before its start wraps around the new year (e.g. December to February)
+
+    Returns:
+        dict[str, np.ndarray]: Read-only columns keyed by field name, in the requested order
+
+    Raises:
+        KeyError: If a field is not stored for the station
+    """
+    return select_columns(open_station_arrays(parsed_path, file_name), fields, start, end)
+
+
+def select_columns(arrays, fields=None, start=None, end=None):
+    """
+    Column and time-window selection on an opened station, see select_station_columns.
+
+    Args:
+        arrays (StationArrays): Opened station, see open_station_arrays
+        fields (list[str], optional): Hourly fields to return, all fields when omitted
+        start (tuple[int], optional): First (month, day, hour) of the window, inclusive
+        end (tuple[int], optional): Last (month, day, hour) of the window, inclusive
+
+    Returns:
+        dict[str, np.ndarray]: Read-only columns keyed by field name, in the requested order
+    """
+    fields = list(arrays.keys()) if fields is None else list(fields)
+    missing = [field for field in fields if field not in arrays]
+    if missing:
+        raise KeyError(f"Unknown weather fields {missing} for '{arrays.file_name}'")
+
+    if start is None and end is None:
+        return {field: arrays[field] for field in fields}
+
+    (start_month, start_day, start_hour), (end_month, end_day, end_hour) = _window_bounds(start, end)
+    start_key = _window_key(start_month, start_day, start_hour)
+    end_key = _window_key(end_month, end_day, end_hour)
+    wraps = start_key > end_key
+
+    # Row ranges of the months touched by the window
+    row_groups = arrays.row_groups or [{"month": None, "start": 0, "end": len(arrays)}]
+    ranges = [
+        (group["start"], group["end"])
+        for group in row_groups
+        if group["month"] is None
+        or (wraps and (group["month"] >= start_month or group["month"] <= end_month))
+        or (not wraps and start_month <= group["month"] <= end_month)
+    ]
+
+    # Exact day/hour filter on the remaining rows
+    month, day, hour = (arrays.take(name, ranges).astype("int64") for name in ("Month", "Day", "Hour"))
+    keys = _window_key(month, day, hour)
+    if wraps:
+        mask = (keys >= start_key) | (keys <= end_key)
+    else:
+        mask = (keys >= start_key) & (keys <= end_key)
+
+    columns = {}
+    with stage("station.select", file_name=arrays.file_name, fields=len(fields)) as timer:
+        for field in fields:
+            column = arrays.take(field, ranges)[mask]
+            column.flags.writeable = False
+            columns[field] = column
+        timer.add(rows=int(mask.sum()), rows_scanned=len(mask))
+
+    return columns
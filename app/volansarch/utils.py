@@ -1,5 +1,13 @@
 import os
-from typing import List, Optional
+from contextlib import contextmanager
+from typing import IO, Iterator, List, Optional, Tuple
+
+# Suffix of the files atomic_write writes before moving them in place
+TEMPORARY_SUFFIX = ".tmp"
+
+# Raw files that can hold several stations, and the separator of bundle and member in parsed names
+ARCHIVE_EXTENSIONS = (".zip", ".tar.gz", ".tgz")
+BUNDLE_MEMBER_SEPARATOR = "__"
 
 
 def get_files_in_directory(directory_path: str, include_subdirectories: bool = False) -> List[str]:
@@ -40,3 +48,124 @@ def get_files_in_directory(directory_path: str, include_subdirectories: bool = F
     
     return files
 
+
+
+def station_source(file_name: str) -> Tuple[str, Optional[str]]:
+    """
+    Get the raw file a station comes from, and its member path for a bundle member.
+
+    Bundle members are named "<bundle>/<member>" (see epw_bundle), possibly behind the
+    raw directory; the last directory ending like an archive is taken as the bundle.
+
+    Args:
+        file_name (str): Station file name or path, e.g. "region.tar.gz/R/USA_IL_Chicago.725300_TMYx.epw"
+
+    Returns:
+        Tuple[str, Optional[str]]: Raw file name and member path, e.g. ("region.tar.gz",
+        "R/USA_IL_Chicago.725300_TMYx.epw"), the member is None for a standalone file
+    """
+    parts = file_name.replace("\\", "/").split("/")
+
+    for position in range(len(parts) - 2, -1, -1):
+        if parts[position].lower().endswith(ARCHIVE_EXTENSIONS):
+            return parts[position], "/".join(parts[position + 1:])
+
+    return parts[-1], None
+
+
+def station_base_name(file_name: str) -> str:
+    """
+    Get the base name (no directory, no extension) of a station file.
+
+    The combined index may hold Windows or POSIX style paths, so both separators are handled.
+    A bundle member keeps its bundle and member directories in the name, so stations with
+    the same file name in different bundles (or next to the bundle) do not share outputs.
+
+    Args:
+        file_name (str): Station file name or path, e.g. "USA_IL_Chicago.725300_TMYx.zip"
+
+    Returns:
+        str: The name without directory and extension, e.g. "USA_IL_Chicago.725300_TMYx",
+        or "region.tar.gz__R__USA_IL_Chicago.725300_TMYx" for "region.tar.gz/R/USA_IL_Chicago.725300_TMYx.epw"
+    """
+    raw_file, member = station_source(file_name)
+
+    if member is None:
+        return os.path.splitext(raw_file)[0]
+
+    return BUNDLE_MEMBER_SEPARATOR.join([raw_file] + os.path.splitext(member)[0].split("/"))
+
+
+@contextmanager
+def atomic_write(path: str, mode: str = "w", encoding: Optional[str] = None, newline: Optional[str] = None) -> Iterator[IO]:
+    """
+    Write a file through a temporary file that replaces it only once fully written.
+
+    The temporary file is created next to the target (same file system), flushed to
+    disk and moved over the target with os.replace, so readers and an interrupted run
+    see either the previous file or the new one, never a truncated file. It is removed
+    when the block raises.
+
+    Args:
+        path (str): Path of the file to write
+        mode (str): "w" for text or "wb" for binary
+        encoding (Optional[str]): Text encoding
+        newline (Optional[str]): Newline translation of text files, "" for CSV writers
+
+    Yields:
+        IO: Open handle on the temporary file
+
+    Example:
+        with atomic_write(path, "w", encoding="utf-8") as file:
+            json.dump(data, file)
+    """
+    directory, name = os.path.split(path)
+    # Hidden and unique per writer, so concurrent writers never share a temporary file
+    temporary_path = os.path.join(directory, f".{name}.{os.getpid()}.{os.urandom(4).hex()}{TEMPORARY_SUFFIX}")
+
+    try:
+        with open(temporary_path, mode.replace("w", "x"), encoding=encoding, newline=newline) as file:
+            yield file
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(temporary_path, path)
+    except BaseException:
+        if os.path.exists(temporary_path):
+            os.remove(temporary_path)
+        raise
+
+
+def remove_temporary_files(directory_path: str, older_than: Optional[float] = None) -> List[str]:
+    """
+    Remove the temporary files an interrupted atomic_write left in a directory.
+
+    Another process may be writing in the same directory, so pass older_than to only
+    remove temporary files not modified since then (its in-flight files are newer).
+
+    Args:
+        directory_path (str): Directory to clean
+        older_than (Optional[float]): Modification time (seconds since the epoch) the files
+            must be older than, None removes every temporary file
+
+    Returns:
+        List[str]: Names of the removed files
+    """
+    if not os.path.isdir(directory_path):
+        return []
+
+    removed = []
+    for name in os.listdir(directory_path):
+        if not (name.startswith(".") and name.endswith(TEMPORARY_SUFFIX)):
+            continue
+
+        path = os.path.join(directory_path, name)
+        try:
+            if older_than is not None and os.path.getmtime(path) >= older_than:
+                continue
+            os.remove(path)
+        except FileNotFoundError:
+            # Moved in place or removed by its writer meanwhile
+            continue
+        removed.append(name)
+
+    return removed
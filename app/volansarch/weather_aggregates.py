@@ -0,0 +1,143 @@
+# Per-station summaries of the hourly data, computed once at ingest time
+import os
+import json
+import pandas as pd
+
+from .utils import station_base_name, atomic_write
+
+# Base temperatures of the degree days (°C)
+HEATING_BASE_TEMPERATURE = 18.0
+COOLING_BASE_TEMPERATURE = 18.0
+
+AGGREGATES_SUFFIX = ".agg.json"
+
+# Cross-station table of the annual summaries, kept next to the combined index
+AGGREGATES_TABLE_NAME = "station_aggregates.csv"
+
+
+def compute_aggregates(weather_columns):
+    """
+    Summarize the hourly data of a station with vectorized group-bys.
+
+    Degree days are computed from the daily mean dry bulb temperature. Radiation
+    totals assume hourly rows (Wh/m² per row) and are given in kWh/m².
+
+    Args:
+        weather_columns (pd.DataFrame): Typed hourly columns, see parse_weather_columns
+
+    Returns:
+        dict: "daily" (one row per Month/Day), "monthly" (one row per Month) and
+        "annual" (a single row) DataFrames
+    """
+    temperature = "Dry_Bulb_Temperature"
+    radiation = "Global_Horizontal_Radiation"
+
+    # Daily values
+    daily_group = weather_columns.groupby(["Month", "Day"], sort=True)
+    daily = pd.DataFrame({
+        "Dry_Bulb_Mean": daily_group[temperature].mean(),                                    # Daily mean dry bulb temperature (°C).
+        "Dry_Bulb_Min": daily_group[temperature].min(),                                      # Daily minimum dry bulb temperature (°C).
+        "Dry_Bulb_Max": daily_group[temperature].max(),                                      # Daily maximum dry bulb temperature (°C).
+        "Global_Horizontal_Radiation_Total": daily_group[radiation].sum(min_count=1) / 1000,  # Daily global horizontal radiation (kWh/m²).
+    })
+    daily["Heating_Degree_Days"] = (HEATING_BASE_TEMPERATURE - daily["Dry_Bulb_Mean"]).clip(lower=0)
+    daily["Cooling_Degree_Days"] = (daily["Dry_Bulb_Mean"] - COOLING_BASE_TEMPERATURE).clip(lower=0)
+    daily = daily.reset_index()
+
+    # Monthly values
+    monthly_group = weather_columns.groupby("Month", sort=True)
+    daily_by_month = daily.groupby("Month", sort=True)
+    monthly = pd.DataFrame({
+        "Dry_Bulb_Mean": monthly_group[temperature].mean(),                                    # Monthly mean dry bulb temperature (°C).
+        "Dry_Bulb_Min": monthly_group[temperature].min(),                                      # Monthly minimum dry bulb temperature (°C).
+        "Dry_Bulb_Max": monthly_group[temperature].max(),                                      # Monthly maximum dry bulb temperature (°C).
+        "Dew_Point_Mean": monthly_group["Dew_Point_Temperature"].mean(),                       # Monthly mean dew point temperature (°C).
+        "Relative_Humidity_Mean": monthly_group["Relative_Humidity"].mean(),                   # Monthly mean relative humidity (%).
+        "Wind_Speed_Mean": monthly_group["Wind_Speed"].mean(),                                 # Monthly mean wind speed (m/s).
+        "Global_Horizontal_Radiation_Total": monthly_group[radiation].sum(min_count=1) / 1000,  # Monthly global horizontal radiation (kWh/m²).
+        "Heating_Degree_Days": daily_by_month["Heating_Degree_Days"].sum(),                    # Heating degree days (°C·day).
+        "Cooling_Degree_Days": daily_by_month["Cooling_Degree_Days"].sum(),                    # Cooling degree days (°C·day).
+    }).reset_index()
+
+    # Annual values
+    annual = pd.DataFrame([{
+        "Dry_Bulb_Mean": weather_columns[temperature].mean(),
+        "Dry_Bulb_Min": weather_columns[temperature].min(),
+        "Dry_Bulb_Max": weather_columns[temperature].max(),
+        "Global_Horizontal_Radiation_Total": weather_columns[radiation].sum(min_count=1) / 1000,
+        "Heating_Degree_Days": daily["Heating_Degree_Days"].sum(),
+        "Cooling_Degree_Days": daily["Cooling_Degree_Days"].sum(),
+    }])
+
+    return {"daily": daily, "monthly": monthly, "annual": annual}
+
+
+def aggregates_table_entry(file_name, aggregates):
+    # Row of the cross-station table: file name plus the annual summary
+    entry = {"file_name": file_name}
+    entry.update({name: _json_value(value) for name, value in aggregates["annual"].iloc[0].items()})
+
+    return entry
+
+
+def save_aggregates(aggregates, parsed_path, base_name):
+    """
+    Write the summaries of a station to "<base_name>.agg.json" in the parsed store.
+
+    Args:
+        aggregates (dict): Output of compute_aggregates
+        parsed_path (str): Directory of the parsed store
+        base_name (str): Station file name without extension
+
+    Returns:
+        str: Path of the written file
+    """
+    save_path = os.path.join(parsed_path, base_name + AGGREGATES_SUFFIX)
+
+    tables = {
+        name: {column: [_json_value(value) for value in table[column].tolist()] for column in table.columns}
+        for name, table in aggregates.items()
+    }
+
+    os.makedirs(parsed_path, exist_ok=True)
+    with atomic_write(save_path, "w", encoding="utf-8") as file:
+        json.dump(tables, file)
+
+    return save_path
+
+
+def load_aggregates(parsed_path, file_name):
+    """
+    Read the stored summaries of a station without touching its hourly data.
+
+    Args:
+        parsed_path (str): Directory of the parsed store
+        file_name (str): Station file name as stored in the combined index
+
+    Returns:
+        dict: "daily", "monthly" and "annual" DataFrames
+    """
+    path = os.path.join(parsed_path, station_base_name(file_name) + AGGREGATES_SUFFIX)
+
+    with open(path, "r", encoding="utf-8") as file:
+        tables = json.load(file)
+
+    return {name: pd.DataFrame(table) for name, table in tables.items()}
+
+
+def delete_aggregates(parsed_path, file_name):
+    # Remove the stored summaries of a station, True when there were some
+    path = os.path.join(parsed_path, station_base_name(file_name) + AGGREGATES_SUFFIX)
+    if not os.path.isfile(path):
+        return False
+
+    os.remove(path)
+    return True
+
+
+def _json_value(value):
+    # NaN is not valid JSON, missing values are stored as null
+    if isinstance(value, float) and value != value:
+        return None
+
+    return value.item() if hasattr(value, "item") else value
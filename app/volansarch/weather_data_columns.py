@@ -0,0 +1,115 @@
+# Columnar parsing of the EPW hourly data block
+import csv
+import io
+import numpy as np
+import pandas as pd
+
+# Hourly fields in file order with the type used for each column
+WEATHER_FIELDS = (
+    ("Year", "int"),                                        # Year of the data (e.g., 2019).
+    ("Month", "int"),                                       # Month of the data (1-12).
+    ("Day", "int"),                                         # Day of the month (1-31).
+    ("Hour", "int"),                                        # Hour of the day (1-24, where 1 is 00:00:01-01:00:00).
+    ("Minute", "int"),                                      # Minute of the hour (0-59, typically 0 or 30).
+    ("Data_Source_Uncertainty_Flags", "str"),               # String indicating data source and uncertainty.
+    ("Dry_Bulb_Temperature", "float"),                      # Dry bulb temperature (°C).
+    ("Dew_Point_Temperature", "float"),                     # Dew point temperature (°C).
+    ("Relative_Humidity", "float"),                         # Relative humidity (0-100%).
+    ("Atmospheric_Station_Pressure", "float"),              # Atmospheric pressure at the station (Pa).
+    ("Extraterrestrial_Horizontal_Radiation", "float"),     # Extraterrestrial horizontal radiation (Wh/m²).
+    ("Extraterrestrial_Direct_Normal_Radiation", "float"),  # Extraterrestrial direct normal radiation (Wh/m²).
+    ("Horizontal_Infrared_Radiation_Intensity", "float"),   # Horizontal infrared radiation intensity (Wh/m²).
+    ("Global_Horizontal_Radiation", "float"),               # Global horizontal radiation (Wh/m²).
+    ("Direct_Normal_Radiation", "float"),                   # Direct normal radiation (Wh/m²).
+    ("Diffuse_Horizontal_Radiation", "float"),              # Diffuse horizontal radiation (Wh/m²).
+    ("Global_Horizontal_Illuminance", "float"),             # Global horizontal illuminance (lux).
+    ("Direct_Normal_Illuminance", "float"),                 # Direct normal illuminance (lux).
+    ("Diffuse_Horizontal_Illuminance", "float"),            # Diffuse horizontal illuminance (lux).
+    ("Zenith_Luminance", "float"),                          # Zenith luminance (cd/m²).
+    ("Wind_Direction", "float"),                            # Wind direction (degrees, 0-360).
+    ("Wind_Speed", "float"),                                # Wind speed (m/s).
+    ("Total_Sky_Cover", "float"),                           # Total sky cover (%).
+    ("Opaque_Sky_Cover", "float"),                          # Opaque sky cover (%).
+    ("Visibility", "float"),                                # Visibility (km).
+    ("Ceiling_Height", "float"),                            # Ceiling height (m).
+    ("Present_Weather_Observation", "float"),               # Present weather observation code.
+    ("Present_Weather_Codes", "float"),                     # Additional present weather codes.
+    ("Precipitable_Water", "float"),                        # Precipitable water (mm).
+    ("Aerosol_Optical_Depth", "float"),                     # Aerosol optical depth (unitless).
+    ("Snow_Depth", "float"),                                # Snow depth (cm).
+    ("Days_Since_Last_Snowfall", "float"),                  # Number of days since last snowfall.
+    ("Albedo", "float"),                                    # Albedo (unitless).
+    ("Liquid_Precipitation_Depth", "float"),                # Liquid precipitation depth (mm).
+    ("Liquid_Precipitation_Quantity", "float"),             # Liquid precipitation quantity (mm).
+)
+
+WEATHER_FIELD_NAMES = [name for name, _ in WEATHER_FIELDS]
+WEATHER_FIELD_TYPES = dict(WEATHER_FIELDS)
+
+# Values treated as missing in numeric fields
+INVALID_FLOAT_VALUES = ["N_A", ""]
+
+_READ_DTYPES = {"int": "int64", "str": "object", "float": "float64"}
+
+
+def parse_weather_columns(lines):
+    """
+    Parse the hourly data block of an EPW file into typed columns in one pass.
+
+    Args:
+        lines (list[str]): Data rows of the EPW file (everything after the 8 header lines)
+
+    Returns:
+        pd.DataFrame: One column per entry of WEATHER_FIELDS, int64 for the time
+        fields, stripped strings for the uncertainty flags and float64 (NaN for
+        missing values) for the measurements
+    """
+    columns = pd.read_csv(
+        io.StringIO("".join(lines)),
+        header=None,
+        usecols=range(len(WEATHER_FIELDS)),
+        dtype={i: _READ_DTYPES[kind] for i, (_, kind) in enumerate(WEATHER_FIELDS)},
+        na_values={i: INVALID_FLOAT_VALUES for i, (_, kind) in enumerate(WEATHER_FIELDS) if kind == "float"},
+        keep_default_na=False,
+        quoting=csv.QUOTE_NONE,
+        float_precision="round_trip",
+        engine="c",
+    )
+    columns.columns = WEATHER_FIELD_NAMES
+    columns["Data_Source_Uncertainty_Flags"] = columns["Data_Source_Uncertainty_Flags"].str.strip()
+
+    return columns
+
+
+def weather_columns_to_records(columns):
+    """
+    Convert typed weather columns back into the list of row dicts stored in the parsed files.
+
+    Integer columns become strings and missing measurements become None, matching the
+    values produced by the row-by-row parser.
+
+    Args:
+        columns (pd.DataFrame): Columns as returned by parse_weather_columns, optionally
+            with extra integer columns (e.g. the Jalali date) inserted
+
+    Returns:
+        list[dict]: One dict per row, keys in column order
+    """
+    values = []
+
+    for name in columns.columns:
+        column = columns[name]
+
+        if WEATHER_FIELD_TYPES.get(name) == "float":
+            array = column.to_numpy(dtype="float64")
+            converted = array.astype(object)
+            converted[np.isnan(array)] = None
+            values.append(converted.tolist())
+        elif WEATHER_FIELD_TYPES.get(name) == "str":
+            values.append(column.tolist())
+        else:
+            values.append([str(value) for value in column.tolist()])
+
+    keys = list(columns.columns)
+
+    return [dict(zip(keys, row)) for row in zip(*values)]
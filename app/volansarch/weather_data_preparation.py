@@ -1,38 +1,68 @@
-import pandas as pd
 import os
-import json
-import zipfile
-from datetime import datetime
-from datetime import datetime
-import jdatetime
-
-from dotenv import load_dotenv, dotenv_values
-SETTINGS = dotenv_values()
+import io
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed, wait, FIRST_COMPLETED
+
+from .weather_data_columns import weather_columns_to_records
+from .epw_reader import EPWReader
+from .utils import station_base_name, station_source, remove_temporary_files
+from .jalali_calendar import gregorian_to_jalali
+from .station_store import save_station, delete_station, DEFAULT_PARSED_FORMAT
+from .combined_index import CombinedIndexWriter, read_combined_index
+from .weather_aggregates import compute_aggregates, save_aggregates, delete_aggregates, aggregates_table_entry, AGGREGATES_TABLE_NAME
+from .instrumentation import stage, enable_json_log
+from .ingest_manifest import IngestManifest, IngestCheckpoint, MANIFEST_NAME, CHECKPOINT_NAME, is_raw_file, file_fingerprint
+from .epw_bundle import is_bundle, iter_bundle_members
+from .settings import get_settings
+
+# Shared with the selections, resolved once per process
+SETTINGS = get_settings()
+
+# Temporary files untouched for this long are left over, whoever wrote them (seconds)
+STALE_TEMPORARY_AGE = 3600
 
 class EPWFilePreparator:
     def __init__(self):
         self.raw_data_file_names = self.list_files_in_directory(SETTINGS["EPW_RAW_PATH"])
         self.parsed_data_file_names = self.list_files_in_directory(SETTINGS["EPW_PARSED_PATH"])
+        self.index_writer = CombinedIndexWriter(
+            os.path.join(SETTINGS["EPW_COMBINED_PATH"], SETTINGS["EPW_COMBINED_INDEX_NAME"])
+        )
+        self.aggregates_writer = CombinedIndexWriter(os.path.join(SETTINGS["EPW_COMBINED_PATH"], AGGREGATES_TABLE_NAME))
+        self.last_aggregates_entry = None
+        self.manifest = IngestManifest(os.path.join(SETTINGS["EPW_COMBINED_PATH"], MANIFEST_NAME))
+        # Files finished by a parse_many batch that has not been committed yet
+        self.checkpoint = IngestCheckpoint(os.path.join(SETTINGS["EPW_COMBINED_PATH"], CHECKPOINT_NAME))
+        self.update_plan = None
+
+        # Optional structured log of the ingest stages
+        if SETTINGS.get("EPW_METRICS_LOG"):
+            enable_json_log(SETTINGS["EPW_METRICS_LOG"])
+
+    def parse_file(self, file_name, output_format=None, update_index=True, source=None):
+        # A bundle member comes as source (binary handle on its EPW content), file_name is "<bundle>/<member>"
+        # Whole-file timer around the parse, see instrumentation
+        with stage("ingest.file", file_name=file_name):
+            return self._parse_file(file_name, output_format, update_index, source)
+
+    def _parse_file(self, file_name, output_format, update_index, source=None):
+        # From the first output on, only indexed stations are adopted, see list_files_needed_update
+        self.manifest.create()
 
-    def parse_file(self, file_name):
         # Creating the loading path
         file_path = os.path.join(SETTINGS["EPW_RAW_PATH"], file_name)
-
-        # Opening file depending the format
-        if os.path.splitext(file_name)[-1] == ".zip":
-            with zipfile.ZipFile(file_path, 'r') as zip_ref:
-                # Filter for .epw files
-                epw_file = next((f for f in zip_ref.namelist() if f.endswith('.epw')), None)
-
-                with zip_ref.open(epw_file) as file:
-                    lines = [line.decode('utf-8') for line in file.readlines()]
-
-        elif os.path.splitext(file_name)[-1] == ".epw":
-            with open(file_path, 'r') as file:
-                lines = file.readlines()
-
-        else:
-            raise ValueError("Unsupported file format. Only .zip and .epw files are allowed.")
+        # Bundles are recorded in the manifest as a whole, see parse_many
+        fingerprint = file_fingerprint(file_path) if update_index and source is None else None
+
+        # Streaming the file: header lines first, then the data rows chunk by chunk
+        with stage("ingest.read", file_name=file_name) as timer, EPWReader(file_path if source is None else source) as reader:
+            lines = reader.header
+            # Decoding the data block into typed columns
+            weather_columns = reader.read_columns()
+            if timer.active:
+                timer.add(rows=len(weather_columns))
+                if source is None:
+                    timer.add(bytes_read=os.path.getsize(file_path))
 
         # Parsing data
         data = {}
@@ -41,19 +71,7 @@ class EPWFilePreparator:
         data["file_name"] = file_path.split("\\")[-1]
 
         # Extracting location data
-        location_row = lines[0].split(",")
-
-        data["location"] = {
-            "city": location_row[1],
-            "state_province": location_row[2],
-            "country": location_row[3],
-            "data_source": location_row[4],
-            "station_id": location_row[5],
-            "latitude": float(location_row[6]),
-            "longitude": float(location_row[7]),
-            "timezone": float(location_row[8]),
-            "elevation_meters": float(location_row[9]),
-        }
+        data["location"] = self.parse_location(lines[0])
 
         # Metadata
         # 1. DESIGN CONDITIONS
@@ -273,91 +291,142 @@ class EPWFilePreparator:
         }
 
         # Main data
-        weather_data = []
-
-        for i in range(8, len(lines)):
-            data_row = lines[i].split(",")
-
-            # Create datetime object for Jalali conversion
-            gregorian_dt = datetime(parse_int(data_row[0]), parse_int(data_row[1]), parse_int(data_row[2]), parse_int(data_row[3])-1, parse_int(data_row[4]))
-            jalali_dt = jdatetime.datetime.fromgregorian(datetime=gregorian_dt)
-            
-            weather_data.append({
-                "Year": str(parse_int(data_row[0])),                                # Year of the data (e.g., 2019).
-                "Month": str(parse_int(data_row[1])),                               # Month of the data (1-12).
-                "Day": str(parse_int(data_row[2])),                                 # Day of the month (1-31).
-                "Hour": str(parse_int(data_row[3])),                                # Hour of the day (1-24, where 1 is 00:00:01-01:00:00).
-                "Minute": str(parse_int(data_row[4])),                              # Minute of the hour (0-59, typically 0 or 30).
-                "Year_Jalali": str(jalali_dt.year),                                 # Jalali year (e.g., 1398).
-                "Month_Jalali": str(jalali_dt.month),                               # Jalali month (1-12).
-                "Day_Jalali": str(jalali_dt.day),                                   # Jalali day (1-31).
-                "Data_Source_Uncertainty_Flags": data_row[5].strip(),    # String indicating data source and uncertainty.
-                "Dry_Bulb_Temperature": parse_float(data_row[6]),               # Dry bulb temperature (°C).
-                "Dew_Point_Temperature": parse_float(data_row[7]),              # Dew point temperature (°C).
-                "Relative_Humidity": parse_float(data_row[8]),                   # Relative humidity (0-100%).
-                "Atmospheric_Station_Pressure": parse_float(data_row[9]),         # Atmospheric pressure at the station (Pa).
-                "Extraterrestrial_Horizontal_Radiation": parse_float(data_row[10]), # Extraterrestrial horizontal radiation (Wh/m²).
-                "Extraterrestrial_Direct_Normal_Radiation": parse_float(data_row[11]), # Extraterrestrial direct normal radiation (Wh/m²).
-                "Horizontal_Infrared_Radiation_Intensity": parse_float(data_row[12]), # Horizontal infrared radiation intensity (Wh/m²).
-                "Global_Horizontal_Radiation": parse_float(data_row[13]), # Global horizontal radiation (Wh/m²).
-                "Direct_Normal_Radiation": parse_float(data_row[14]), # Direct normal radiation (Wh/m²).
-                "Diffuse_Horizontal_Radiation": parse_float(data_row[15]), # Diffuse horizontal radiation (Wh/m²).
-                "Global_Horizontal_Illuminance": parse_float(data_row[16]), # Global horizontal illuminance (lux).
-                "Direct_Normal_Illuminance": parse_float(data_row[17]), # Direct normal illuminance (lux).
-                "Diffuse_Horizontal_Illuminance": parse_float(data_row[18]), # Diffuse horizontal illuminance (lux).
-                "Zenith_Luminance": parse_float(data_row[19]), # Zenith luminance (cd/m²).
-                "Wind_Direction": parse_float(data_row[20]), # Wind direction (degrees, 0-360).
-                "Wind_Speed": parse_float(data_row[21]), # Wind speed (m/s).
-                "Total_Sky_Cover": parse_float(data_row[22]), # Total sky cover (%).
-                "Opaque_Sky_Cover": parse_float(data_row[23]), # Opaque sky cover (%).
-                "Visibility": parse_float(data_row[24]), # Visibility (km).
-                "Ceiling_Height": parse_float(data_row[25]), # Ceiling height (m).
-                "Present_Weather_Observation": parse_float(data_row[26]), # Present weather observation code.
-                "Present_Weather_Codes": parse_float(data_row[27]), # Additional present weather codes.
-                "Precipitable_Water": parse_float(data_row[28]), # Precipitable water (mm).
-                "Aerosol_Optical_Depth": parse_float(data_row[29]), # Aerosol optical depth (unitless).
-                "Snow_Depth": parse_float(data_row[30]), # Snow depth (cm).
-                "Days_Since_Last_Snowfall": parse_float(data_row[31]), # Number of days since last snowfall.
-                "Albedo": parse_float(data_row[32]), # Albedo (unitless).
-                "Liquid_Precipitation_Depth": parse_float(data_row[33]), # Liquid precipitation depth (mm).
-                "Liquid_Precipitation_Quantity": parse_float(data_row[34]), # Liquid precipitation quantity (mm).
-            })
-
-        data["weather_data"] = weather_data
+        # Jalali date of every row
+        # Converted for the whole column at once through a day-level lookup table
+        with stage("ingest.jalali", file_name=file_name, rows=len(weather_columns)):
+            jalali_dates = gregorian_to_jalali(
+                weather_columns["Year"], weather_columns["Month"], weather_columns["Day"],
+                weather_columns["Hour"], weather_columns["Minute"],
+            )
+            weather_columns.insert(5, "Year_Jalali", jalali_dates["year"])       # Jalali year (e.g., 1398).
+            weather_columns.insert(6, "Month_Jalali", jalali_dates["month"])     # Jalali month (1-12).
+            weather_columns.insert(7, "Day_Jalali", jalali_dates["day"])         # Jalali day (1-31).
+
+        with stage("ingest.records", file_name=file_name, rows=len(weather_columns)):
+            data["weather_data"] = weather_columns_to_records(weather_columns)
 
         # Adding data period to the weather data
         years = [row["Year"] for row in data["weather_data"]]
         data["metadata"]["year_start"] = min(years)
         data["metadata"]["year_end"] = max(years)
 
-        # Saving the data to a csv file
-        # Creating the save path
-        # Change the file extension to .json
-        base_name = os.path.splitext(file_name)[0]
-        save_name = base_name + ".json"
-        save_path = os.path.join(SETTINGS["EPW_PARSED_PATH"], save_name)
-
-        os.makedirs(os.path.dirname(save_path), exist_ok=True)
-        with open(save_path, "w") as file:
-            json.dump(data, file, indent=4)
+        # Saving the data to the parsed store
+        # The format comes from the argument, then EPW_PARSED_FORMAT, then json
+        if output_format is None:
+            output_format = SETTINGS.get("EPW_PARSED_FORMAT") or DEFAULT_PARSED_FORMAT
+
+        base_name = station_base_name(file_name)
+        with stage("ingest.save_station", file_name=file_name, format=output_format) as timer:
+            save_path = save_station(data, weather_columns, SETTINGS["EPW_PARSED_PATH"], base_name, output_format)
+            if timer.active:
+                timer.add(bytes_written=os.path.getsize(save_path))
+
+        # Monthly/daily/annual summaries, stored next to the station
+        with stage("ingest.aggregates", file_name=file_name) as timer:
+            aggregates = compute_aggregates(weather_columns)
+            aggregates_path = save_aggregates(aggregates, SETTINGS["EPW_PARSED_PATH"], base_name)
+            self.last_aggregates_entry = aggregates_table_entry(data["file_name"], aggregates)
+            if timer.active:
+                timer.add(bytes_written=os.path.getsize(aggregates_path))
 
         # Updating the combined index file
-        EPW_COMBINED_PATH = os.path.join(SETTINGS["EPW_COMBINED_PATH"], SETTINGS["EPW_COMBINED_INDEX_NAME"])
+        # The entry goes to the index journal, parse_many / compact_combined_index rewrite the CSV
+        if update_index:
+            with stage("ingest.index_update", file_name=file_name):
+                self.update_combined_index([self.index_entry(data)], compact=False)
+                self.update_aggregates_table([self.last_aggregates_entry], compact=False)
+                if fingerprint is not None:
+                    self.manifest.record(file_name, fingerprint)
+                    self.manifest.save()
 
-        if os.path.exists(EPW_COMBINED_PATH):
-            summary_df = pd.read_csv(EPW_COMBINED_PATH)
-        else:
-            summary_df = pd.DataFrame(columns=[
-                "file_name", "city", "state_province", "country",
-                "latitude", "longitude", "elevation_meters",
-                "year_start", "year_end"
-            ])
+        return data
+
+    def parse_location(self, location_line):
+        location_row = location_line.split(",")
+
+        return {
+            "city": location_row[1],
+            "state_province": location_row[2],
+            "country": location_row[3],
+            "data_source": location_row[4],
+            "station_id": location_row[5],
+            "latitude": float(location_row[6]),
+            "longitude": float(location_row[7]),
+            "timezone": float(location_row[8]),
+            "elevation_meters": float(location_row[9]),
+        }
 
+    def read_index_entry(self, file_name, source=None):
+        """
+        Build the combined index entry of a raw file without parsing its hourly data.
+
+        Only the LOCATION line is parsed; the data rows are streamed once to collect
+        the year range (TMY files mix years, so every row is looked at, but only up
+        to its first comma). Nothing is written to the parsed store.
+
+        Args:
+            file_name (str): Raw file name in EPW_RAW_PATH (.zip or .epw), or
+                "<bundle>/<member>" for a bundle member
+            source (file object, optional): Binary handle on the EPW content of a bundle member
+
+        Returns:
+            dict: The same entry parse_file would add to the combined index
+        """
+        file_path = os.path.join(SETTINGS["EPW_RAW_PATH"], file_name)
+
+        with EPWReader(file_path if source is None else source) as reader:
+            location = self.parse_location(reader.header[0])
+
+            years = set()
+            for chunk in reader.lines():
+                years.update(line.split(",", 1)[0] for line in chunk if line.strip())
+
+        # Same representation as the parsed weather data (years as strings)
+        years = [str(int(year)) for year in years]
+
+        return self.index_entry({
+            "file_name": file_path.split("\\")[-1],
+            "location": location,
+            "metadata": {"year_start": min(years), "year_end": max(years)},
+        })
+
+    def build_index(self, files=None, workers=None, progress=True):
+        """
+        Build or extend the combined index from file headers only, without parsed outputs.
+
+        Args:
+            files (list[str], optional): Raw file names, defaults to every .zip / .epw / bundle in EPW_RAW_PATH
+            workers (int, optional): Number of worker processes, defaults to the CPU count
+            progress (bool): Print a counter line per finished file
+
+        Returns:
+            dict: "indexed" (list of file names) and "failed" (file name -> error message),
+                bundle members are named "<bundle>/<member>"
+        """
+        if files is None:
+            files = sorted(
+                file for file in self.list_files_in_directory(SETTINGS["EPW_RAW_PATH"]) or []
+                if is_raw_file(file)
+            )
+        files = list(files)
+
+        results, failed = self._run_batch(self._raw_jobs(files, _index_for_batch), workers, progress, self._batch_total(files))
+
+        # One merged index update for the whole batch
+        if results:
+            self.update_combined_index([entry for entry, _ in results.values()])
+
+        return {
+            "indexed": list(results),
+            "failed": failed,
+        }
+
+    def index_entry(self, data):
         # Extract info from parsed data
         loc = data["location"]
         meta = data["metadata"]
 
-        new_entry = {
+        return {
             "file_name": data["file_name"],
             "city": loc.get("city"),
             "state_province": loc.get("state_province"),
@@ -369,17 +438,245 @@ class EPWFilePreparator:
             "year_end": meta.get("year_end")
         }
 
-        # Drop any existing entry for this file (in case of re-parse)
-        summary_df = summary_df[summary_df["file_name"] != data["file_name"]]
+    def update_combined_index(self, entries, compact=True):
+        # Entries are journaled, the CSV itself is only rewritten when compacting
+        self.index_writer.add_many(entries)
 
-        # Append the new entry
-        summary_df = pd.concat([summary_df, pd.DataFrame([new_entry])], ignore_index=True)
-        
-        # Save back
-        os.makedirs(os.path.dirname(EPW_COMBINED_PATH), exist_ok=True)
-        summary_df.to_csv(EPW_COMBINED_PATH, index=False)
+        if compact:
+            self.index_writer.compact()
+        else:
+            self.index_writer.flush()
 
-        return data
+    def update_aggregates_table(self, entries, compact=True):
+        # Cross-station table of annual summaries, journaled like the combined index
+        self.aggregates_writer.add_many(entries)
+
+        if compact:
+            self.aggregates_writer.compact()
+        else:
+            self.aggregates_writer.flush()
+
+    def compact_combined_index(self):
+        self.index_writer.compact()
+        self.aggregates_writer.compact()
+
+    def parse_many(self, files, workers=None, output_format=None, progress=True):
+        """
+        Parse many raw files across a process pool and update the combined index once.
+
+        Each worker unzips, decodes, parses and writes its station; only the small index
+        entry travels back. A failing file is reported and does not stop the batch.
+
+        Every station of a bundle (.tar.gz / .tgz, or a .zip of several stations) is
+        parsed: the bundle is read once, as a stream, and its members are handed to
+        the workers as they come, without extracting anything to disk.
+
+        Every finished file is appended to the ingest checkpoint right away. If the
+        batch is interrupted, the next parse_many takes the files listed there from
+        the checkpoint instead of parsing them again (unless their raw file changed)
+        and only parses the rest; the checkpoint is removed once the index and the
+        manifest hold the whole batch.
+
+        Args:
+            files (list[str]): Raw file names, as returned by list_files_needed_update
+            workers (int, optional): Number of worker processes, defaults to the CPU count.
+                With 1 the files are parsed in this process
+            output_format (str, optional): Parsed store format, see parse_file
+            progress (bool): Print a counter line per finished file
+
+        Returns:
+            dict: "parsed" (list of file names) and "failed" (file name -> error message),
+                bundle members are named "<bundle>/<member>"
+        """
+        # Before any worker writes, see list_files_needed_update
+        self.manifest.create()
+
+        # Work finished by an interrupted batch. Its temporary files are left over, but another
+        # process may be writing next to them: only those older than its last checkpoint
+        # record, or stale, are removed
+        completed = self.checkpoint.completed(SETTINGS["EPW_RAW_PATH"])
+        if len(self.checkpoint):
+            interrupted_at = os.path.getmtime(self.checkpoint.checkpoint_path)
+            remove_temporary_files(SETTINGS["EPW_PARSED_PATH"], older_than=max(interrupted_at, time.time() - STALE_TEMPORARY_AGE))
+
+        files = [file for file in files if file not in completed]
+        bundle_fingerprints = {}
+
+        def checkpoint(file, result):
+            # Bundle members are checked against the fingerprint of their bundle on resume
+            source = result[1] if result[1] is not None else bundle_fingerprints[file.split("/", 1)[0]]
+            self.checkpoint.record(file, result, source)
+
+        jobs = self._raw_jobs(files, _parse_for_batch, output_format, bundle_fingerprints=bundle_fingerprints, skip=completed)
+        results, failed = self._run_batch(jobs, workers, progress, self._batch_total(files), on_result=checkpoint)
+        results = {**completed, **results}
+
+        # A bundle is done once none of its members failed
+        for bundle in list(bundle_fingerprints):
+            if bundle in failed or any(file.startswith(bundle + "/") for file in failed):
+                del bundle_fingerprints[bundle]
+
+        # One merged index and manifest update for the whole batch
+        if results:
+            self.update_combined_index([entry for entry, _, _ in results.values()])
+            self.update_aggregates_table([aggregates for _, _, aggregates in results.values()])
+            for file, (_, fingerprint, _) in results.items():
+                if fingerprint is not None:
+                    self.manifest.record(file, fingerprint)
+
+        # A re-ingested bundle drops the stations it no longer holds, before the manifest marks it
+        # done so an interrupted run retries
+        if bundle_fingerprints:
+            parsed = {station_base_name(file) for file in results}
+            self.remove_stations([
+                file for file in self._indexed_stations(set(bundle_fingerprints))
+                if station_base_name(file) not in parsed
+            ])
+
+        for bundle, fingerprint in bundle_fingerprints.items():
+            self.manifest.record(bundle, fingerprint)
+        if results or bundle_fingerprints:
+            self.manifest.save()
+
+        # Everything is committed, the next batch starts from scratch
+        self.checkpoint.clear()
+
+        return {
+            "parsed": list(results),
+            "failed": failed,
+        }
+
+    def _raw_jobs(self, files, task, *args, bundle_fingerprints=None, skip=()):
+        # (name, task, arguments) of every station: task(file, *args) for a single file and
+        # task("<bundle>/<member>", *args, content) for every member streamed from a bundle
+        # Members named in skip are read past without being parsed
+        # A station whose parsed name is already taken in the batch is failed instead of overwriting it
+        base_names = {}
+
+        def job(name, *job_args):
+            base_name = station_base_name(name)
+            if base_name in base_names:
+                return name, _batch_error, (f"ValueError: Parsed name '{base_name}' is already used by '{base_names[base_name]}'",)
+            base_names[base_name] = name
+            return name, task, (name, *job_args)
+
+        for file in files:
+            file_path = os.path.join(SETTINGS["EPW_RAW_PATH"], file)
+            if not is_bundle(file_path):
+                yield job(file, *args)
+                continue
+
+            try:
+                # Fingerprint taken before reading, like _parse_for_batch does for single files
+                if bundle_fingerprints is not None:
+                    bundle_fingerprints[file] = file_fingerprint(file_path)
+
+                members = 0
+                for member_name, content in iter_bundle_members(file_path):
+                    members += 1
+                    if f"{file}/{member_name}" not in skip:
+                        yield job(f"{file}/{member_name}", *args, content)
+
+                if not members:
+                    raise ValueError(f"No .epw file found in '{file}'")
+            except Exception as error:
+                yield file, _batch_error, (f"{type(error).__name__}: {error}",)
+
+    def _batch_total(self, files):
+        # Number of stations for the progress lines, unknown until bundles have been streamed
+        if any(is_bundle(os.path.join(SETTINGS["EPW_RAW_PATH"], file)) for file in files):
+            return None
+
+        return len(files)
+
+    def _run_batch(self, jobs, workers, progress, total=None, on_result=None):
+        # Run task(*arguments) for every (name, task, arguments) job across a process pool (inline with a single worker)
+        # Tasks return (result, error); failures are collected instead of stopping the batch
+        # on_result(name, result) is called in this process as soon as a job succeeds
+        workers = workers or os.cpu_count() or 1
+
+        results = {}
+        failed = {}
+        count = 0
+
+        def finished(file, result, error):
+            nonlocal count
+            count += 1
+            if error is None:
+                results[file] = result
+                if on_result is not None:
+                    on_result(file, result)
+            else:
+                failed[file] = error
+            if progress:
+                status = "ok" if error is None else f"failed: {error}"
+                print(f"File {count}{'' if total is None else f'/{total}'} - {file} - {status}")
+
+        if workers == 1:
+            for file, task, args in jobs:
+                finished(file, *task(*args))
+        else:
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                futures = {}
+                for file, task, args in jobs:
+                    # Jobs are submitted as they are read, at most two per worker ahead,
+                    # so the members streamed from a bundle do not pile up in memory
+                    if len(futures) >= 2 * workers:
+                        done, _ = wait(futures, return_when=FIRST_COMPLETED)
+                        for future in done:
+                            finished(futures.pop(future), *future.result())
+                    futures[executor.submit(task, *args)] = file
+
+                for future in as_completed(futures):
+                    finished(futures[future], *future.result())
+
+        return results, failed
+
+    def remove_raw_files(self, raw_files):
+        """
+        Drop the stations of raw files that are no longer in EPW_RAW_PATH.
+
+        Their combined index and aggregates table rows, parsed files, sidecars and
+        summaries are removed, and the files are forgotten by the manifest. For a
+        bundle, every station parsed from it goes.
+
+        Args:
+            raw_files (list[str]): Raw file names, e.g. the "removed" files of the update plan
+
+        Returns:
+            list[str]: File names of the removed stations, as stored in the combined index
+        """
+        raw_files = set(raw_files)
+        if not raw_files:
+            return []
+
+        stations = self.remove_stations(self._indexed_stations(raw_files))
+        for file in raw_files:
+            self.manifest.forget(file)
+
+        return stations
+
+    def remove_stations(self, stations):
+        # Index and aggregates table rows, parsed files, sidecars and summaries of these stations
+        if stations:
+            self.index_writer.remove(stations)
+            self.aggregates_writer.remove(stations)
+            for file in stations:
+                delete_station(SETTINGS["EPW_PARSED_PATH"], file)
+                delete_aggregates(SETTINGS["EPW_PARSED_PATH"], file)
+
+        return stations
+
+    def _indexed_files(self):
+        # File names in the combined index, journal included
+        try:
+            return read_combined_index(self.index_writer.index_path)["file_name"].tolist()
+        except FileNotFoundError:
+            return []
+
+    def _indexed_stations(self, raw_files):
+        # Combined index file names of the stations parsed from these raw files (bundle members included)
+        return [file for file in self._indexed_files() if station_source(file)[0] in raw_files]
 
     def list_files_in_directory(self, directory_path):
         if os.path.isdir(directory_path):
@@ -390,7 +687,9 @@ class EPWFilePreparator:
         return files
 
 
-    def list_files_needed_update(self):
+    def list_files_needed_update(self, prune=False):
+        # Plan of the next batch: new and modified raw files, the deleted ones are in update_plan["removed"]
+        # Their stations are only removed from the store with prune=True (see remove_raw_files)
         # Creating the loading path
         if os.path.isdir(SETTINGS["EPW_RAW_PATH"]):
             path_raw = SETTINGS["EPW_RAW_PATH"]
@@ -405,15 +704,67 @@ class EPWFilePreparator:
             path_parsed = SETTINGS["EPW_PARSED_PATH"]
 
 
-        raw_files = [file for file in os.listdir(path_raw) if os.path.isfile(os.path.join(path_raw, file))]
-        raw_files_format_removed = [os.path.splitext(filename)[0] for filename in raw_files]
-
+        # Files parsed before the manifest existed are adopted instead of re-parsed
         parsed_files = [file for file in os.listdir(path_parsed) if os.path.isfile(os.path.join(path_parsed, file))]
-        parsed_files_format_removed = [os.path.splitext(filename)[0] for filename in parsed_files]
+        parsed_files_format_removed = {os.path.splitext(filename)[0] for filename in parsed_files}
+        # Once there is a manifest, a parsed file without an index row is left over by an
+        # interrupted parse (outputs are written before the index), so it is parsed again
+        if self.manifest.exists():
+            parsed_files_format_removed &= {station_base_name(file) for file in self._indexed_files()}
+        # Except the files of an interrupted batch: parse_many commits them from the checkpoint
+        parsed_files_format_removed -= {station_base_name(file) for file in self.checkpoint.entries}
+
+        # New and modified raw files, with their own extension (.zip or .epw)
+        plan = self.manifest.diff(path_raw, parsed_files_format_removed)
+
+        # Raw files deleted since the last run take their stations out of the store and the index
+        if prune:
+            self.remove_raw_files(plan["removed"])
+        if self.manifest.modified:
+            self.manifest.save()
+
+        self.update_plan = plan
+
+        return plan["added"] + plan["changed"]
+
+
+# Preparator reused by every task a batch worker process runs
+_BATCH_PREPARATOR = None
+
+
+def _batch_preparator():
+    global _BATCH_PREPARATOR
+
+    if _BATCH_PREPARATOR is None:
+        _BATCH_PREPARATOR = EPWFilePreparator()
+
+    return _BATCH_PREPARATOR
+
+
+def _parse_for_batch(file_name, output_format, content=None):
+    # content holds the EPW bytes of a bundle member, whose bundle is fingerprinted by parse_many
+    try:
+        preparator = _batch_preparator()
+        if content is None:
+            # Fingerprint taken before parsing, so a file replaced meanwhile is seen as changed next time
+            fingerprint = file_fingerprint(os.path.join(SETTINGS["EPW_RAW_PATH"], file_name))
+            data = preparator.parse_file(file_name, output_format=output_format, update_index=False)
+        else:
+            fingerprint = None
+            data = preparator.parse_file(file_name, output_format=output_format, update_index=False, source=io.BytesIO(content))
+        return (preparator.index_entry(data), fingerprint, preparator.last_aggregates_entry), None
+    except Exception as error:
+        return None, f"{type(error).__name__}: {error}"
+
 
-        # Remove items in list1 that are also in list2
-        filtered_list = [item for item in raw_files_format_removed if item not in parsed_files_format_removed]
-        filtered_list_zip = [item + ".zip" for item in filtered_list]
+def _index_for_batch(file_name, content=None):
+    try:
+        source = None if content is None else io.BytesIO(content)
+        return (_batch_preparator().read_index_entry(file_name, source), None), None
+    except Exception as error:
+        return None, f"{type(error).__name__}: {error}"
 
-        return filtered_list_zip
 
+def _batch_error(error):
+    # Job of a bundle that could not be read
+    return None, error